@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for small2zip's hot paths.
+
+Run with::
+
+    python utils/bench_small2zip.py scan                    # synthetic tree in a temp dir
+    python utils/bench_small2zip.py scan --path /mnt/nfs/x  # an existing tree, read-only
+    python utils/bench_small2zip.py cache                   # scan-cache bytes per file
+    python utils/bench_small2zip.py directory --members 1000000  # central-directory index
+    python utils/bench_small2zip.py delete                  # deletion stage, files/s
+
+Each benchmark times the real module functions -- nothing is reimplemented
+here -- and prints one row per variant, best of ``--repeat`` runs. Numbers on
+a synthetic tree in a temp dir measure CPU overhead with a hot cache; what
+matters in production is the same benchmark pointed at the storage class you
+care about, so every subcommand also takes ``--path``.
+
+Nothing here writes to ``--path``; synthetic trees are deleted afterwards.
+``delete`` is the exception: it only ever deletes trees it created, so
+there ``--path`` names the directory to create them in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import small2zip as s  # noqa: E402
+
+
+def make_tree(root: Path, dirs: int, files: int, size: int) -> Path:
+    """*dirs* directories of *files* files of *size* bytes each, under root/tree."""
+    payload = b"x" * size
+    top = root / "tree"
+    for d in range(dirs):
+        sub = top / f"d{d:05}"
+        sub.mkdir(parents=True)
+        for f in range(files):
+            (sub / f"f{f:06}.bin").write_bytes(payload)
+    return top
+
+
+def best_of(repeat: int, fn) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        gc.collect()  # don't bill one variant for another's garbage
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def report(rows: list[tuple[str, int, float]], unit: str = "files") -> None:
+    base = rows[0][2]
+    print(f"{'variant':<34} {unit:>10} {'seconds':>9} {unit + '/s':>12} {'speedup':>8}")
+    for name, count, secs in rows:
+        rate = count / secs if secs else float("inf")
+        print(f"{name:<34} {count:>10,} {secs:>9.3f} {rate:>12,.0f} {base / secs:>7.2f}x")
+
+
+# --------------------------------------------------------------------------- #
+# scan
+# --------------------------------------------------------------------------- #
+
+
+def bench_scan(top: Path, args: argparse.Namespace) -> None:
+    """Per-directory stat strategies, on one walker thread.
+
+    ``portable`` is the pre-fast-path behaviour, which is still what Windows
+    does: every entry -- directories included -- is stat'ed as it is read.
+    ``d_type`` classifies first and stats only what the walk needs, serially;
+    ``pool`` additionally fans the stats out over ``--stat-threads`` when the
+    probe finds them slow, and ``pool, forced`` always does -- on a hot local
+    cache that shows the hand-off overhead the probe exists to avoid.
+    """
+
+    def walk(collect: bool, pool: s._Pool | None) -> int:
+        return s._scan_dir_tree(top, collect, pool).file_count
+
+    lazy = s._LAZY_DIRENT_STAT
+    for collect in (False, True):
+        rows = []
+        try:
+            s._LAZY_DIRENT_STAT = False
+            secs, n = best_of(args.repeat, lambda: walk(collect, None))
+            rows.append(("portable (stat every entry)", n, secs))
+        finally:
+            s._LAZY_DIRENT_STAT = lazy
+        if lazy:
+            secs, n = best_of(args.repeat, lambda: walk(collect, None))
+            rows.append(("d_type, serial stats", n, secs))
+            slow_ns = s.STAT_SLOW_NS
+            with s._Pool(args.stat_threads, "stat") as pool:
+                secs, n = best_of(args.repeat, lambda: walk(collect, pool))
+                rows.append((f"d_type, stat pool x{args.stat_threads}", n, secs))
+                try:
+                    s.STAT_SLOW_NS = 0
+                    secs, n = best_of(args.repeat, lambda: walk(collect, pool))
+                finally:
+                    s.STAT_SLOW_NS = slow_ns
+                rows.append((f"d_type, stat pool x{args.stat_threads}, forced", n, secs))
+        print(f"\n{'collect (delete / --small)' if collect else 'list (-l)'}: {top}")
+        report(rows)
+
+
+# --------------------------------------------------------------------------- #
+# cache
+# --------------------------------------------------------------------------- #
+
+
+def bench_cache(top: Path, args: argparse.Namespace) -> None:
+    """Resident bytes per file of the scan's enumeration cache.
+
+    ``entry objects`` rebuilds the pre-``FileTable`` representation -- one
+    ``ManifestEntry`` with an absolute ``src`` string per file -- from the
+    same scan, so both rows describe the identical tree.
+    """
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        node = s._scan_dir_tree(top)
+        table_bytes = tracemalloc.get_traced_memory()[0] - base
+        base = tracemalloc.get_traced_memory()[0]
+        legacy = []
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            stack.extend(n.children)
+            for name, size, mtime_ns, attr in n.files or ():
+                legacy.append(s.ManifestEntry(os.path.join(str(n.path), name), "", size, mtime_ns,
+                                              external_attr=attr))
+        legacy_bytes = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    files = node.file_count
+    print(f"\nenumeration cache: {top} ({files:,} files, {node.dir_count:,} dirs)")
+    print(f"{'representation':<34} {'bytes/file':>10} {'per 1M files':>14}")
+    for name, total in (("entry objects (before)", legacy_bytes),
+                        ("FileTable tree (after)", table_bytes)):
+        print(f"{name:<34} {total / files:>10,.0f} {s.human_size(total / files * 1e6):>14}")
+    print(f"reduction: {legacy_bytes / table_bytes:.1f}x "
+          "(the 'after' row includes the DirNode tree itself)")
+
+
+# --------------------------------------------------------------------------- #
+# directory
+# --------------------------------------------------------------------------- #
+
+
+def make_archive(root: Path, members: int) -> Path:
+    """A store archive of *members* empty files, written by the lean writer."""
+    path, now = root / "members.zip", time.time_ns()
+    with s._StoreWriter(path) as writer:
+        for i in range(members):
+            entry = s.ManifestEntry("", f"d{i // 1000:05}/f{i % 1000:03}.bin", 0, now)
+            writer.add_payload(entry, b"", 0)
+    return path
+
+
+def bench_directory(archive: Path, args: argparse.Namespace) -> None:
+    """Open an archive and look every member up: zipfile vs ``_CentralDirectory``.
+
+    Both rows parse the same central directory and resolve every name once,
+    which is what an append or a verify does before any data is read.
+    Memory is the peak traced while the index is alive.
+    """
+
+    def with_zipfile() -> int:
+        with zipfile.ZipFile(archive) as zf:
+            index = zf.NameToInfo
+            return sum(index[info.filename].file_size >= 0 for info in zf.infolist())
+
+    def with_index() -> int:
+        cd = s._CentralDirectory(archive)
+        return sum(cd.find(cd.name(row)) == row for row in range(len(cd)))
+
+    def peak(fn) -> int:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    rows, memory = [], []
+    for name, fn in (("zipfile (ZipInfo per member)", with_zipfile),
+                     ("_CentralDirectory (arrays)", with_index)):
+        secs, n = best_of(args.repeat, fn)
+        rows.append((name, n, secs))
+        memory.append((name, peak(fn) / n))
+    print(f"\ncentral directory: {archive} ({archive.stat().st_size:,} bytes)")
+    report(rows, unit="members")
+    print(f"{'representation':<34} {'bytes/member':>12}")
+    for name, per in memory:
+        print(f"{name:<34} {per:>12,.0f}")
+
+
+# --------------------------------------------------------------------------- #
+# delete
+# --------------------------------------------------------------------------- #
+
+
+def bench_delete(where: Path, args: argparse.Namespace) -> None:
+    """The deletion stage, ``_delete_sources``, on freshly built trees.
+
+    ``full paths, serial`` is the pre-batching behaviour, which is still what
+    platforms without ``dir_fd`` support do: one ``stat`` and one unlink by
+    absolute path per file. ``dir fd`` resolves each directory once; the pool
+    rows add ``--delete-threads``. Every run deletes a new copy of the tree,
+    and only the deletion itself is timed.
+    """
+
+    def run(dir_fd: bool, threads: int) -> tuple[float, int]:
+        best = float("inf")
+        for i in range(args.repeat):
+            with TemporaryDirectory(dir=where) as tmp:
+                top = make_tree(Path(tmp), args.dirs, args.files, args.size)
+                entries, _ = s._entries_from_tree(s._scan_dir_tree(top), s.FolderResult(name="t"))
+                result = s.FolderResult(name="t")
+                real = s._DIR_FD_DELETE
+                pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+                try:
+                    s._DIR_FD_DELETE = dir_fd and real
+                    gc.collect()
+                    t0 = time.perf_counter()
+                    s._delete_sources(top, entries, result, pool=pool)
+                    best = min(best, time.perf_counter() - t0)
+                finally:
+                    s._DIR_FD_DELETE = real
+                    if pool is not None:
+                        pool.shutdown()
+                assert not result.undeleted, result.undeleted[:3]
+        return best, result.deleted_files
+
+    rows = []
+    for name, dir_fd, threads in (
+        ("full paths, serial", False, 1),
+        ("dir fd, serial", True, 1),
+        (f"dir fd, pool x{args.delete_threads}", True, args.delete_threads),
+    ):
+        secs, n = run(dir_fd, threads)
+        rows.append((name, n, secs))
+    print(f"\ndelete: {args.dirs} dirs x {args.files} files under {where}")
+    report(rows)
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="bench_small2zip", description=__doc__.splitlines()[0])
+    p.add_argument("--path", type=Path, help="Benchmark this existing tree instead.")
+    p.add_argument("--dirs", type=int, default=20)
+    p.add_argument("--files", type=int, default=2000, help="Files per directory.")
+    p.add_argument("--size", type=int, default=4096, help="Bytes per synthetic file.")
+    p.add_argument("--repeat", type=int, default=3)
+    sub = p.add_subparsers(dest="bench", required=True)
+    scan = sub.add_parser("scan", help="Directory walk: files/s per stat strategy.")
+    scan.add_argument("--stat-threads", type=int, default=s.DEFAULT_STAT_THREADS or 16)
+    sub.add_parser("cache", help="Enumeration cache: resident bytes per file.")
+    directory = sub.add_parser("directory", help="Archive index: open + lookup time and memory.")
+    directory.add_argument("--members", type=int, default=200_000,
+                           help="Members of the synthetic archive (--path names a .zip instead).")
+    delete = sub.add_parser("delete", help="Deletion stage: files/s, serial vs --delete-threads.")
+    delete.add_argument("--delete-threads", type=int, default=s.DEFAULT_DELETE_THREADS)
+    args = p.parse_args(argv)
+
+    bench = {"scan": bench_scan, "cache": bench_cache, "directory": bench_directory,
+             "delete": bench_delete}[args.bench]
+    if args.path:
+        bench(args.path.resolve(), args)
+        return 0
+    with TemporaryDirectory() as tmp:
+        if args.bench == "delete":
+            bench(Path(tmp), args)
+            return 0
+        if args.bench == "directory":
+            bench(make_archive(Path(tmp), args.members), args)
+            return 0
+        top = make_tree(Path(tmp), args.dirs, args.files, args.size)
+        bench(top, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -41,14 +41,21 @@ from __future__ import annotations
 
 import argparse
 import contextlib
+import errno
 import io
+import json
 import os
+import shutil
+import signal
 import subprocess
 import sys
+import threading
 import time
 import unittest
 import zipfile
 import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -70,7 +77,11 @@ def make_args(**overrides) -> argparse.Namespace:
     Kept in sync by hand with the attributes process_folder touches; if you add
     a new flag it reads, add its default here too.
     """
-    base = dict(exists=False, verify="full", keep=False, dry_run=False)
+    base = dict(
+        exists=False, verify="full", keep=False, dry_run=False, crc_catalog=False,
+        read_ahead=s.READ_AHEAD_DEFAULT, resume=False, device_workers=None,
+        auto_workers=False, delete_threads=1, group_commit=False, no_progress=False,
+    )
     base.update(overrides)
     return argparse.Namespace(**base)
 
@@ -120,11 +131,14 @@ class TempRepo(unittest.TestCase):
 
     def setUp(self) -> None:
         s.cancel_event.clear()  # tests may set it; never leak across cases
+        s.io_limits.configure()  # likewise rate limits set through main()
         self._tmp = TemporaryDirectory()
         self.root = Path(self._tmp.name)
 
     def tearDown(self) -> None:
         s.cancel_event.clear()
+        s.io_limits.configure()
+        s.events.close()  # a test that opened a stream directly
         self._tmp.cleanup()
 
     def run_folder(self, folder: Path, **argkw) -> s.FolderResult:
@@ -132,6 +146,21 @@ class TempRepo(unittest.TestCase):
             folder, make_args(**argkw), zipfile.ZIP_STORED, None, NullProgress()
         )
 
+    def patch(self, obj, name: str, value):
+        """Set ``obj.name`` to *value* until the test ends; returns what was there.
+
+        The original is put back from ``vars(obj)``, not ``getattr``, so a
+        staticmethod is restored as one and an inherited attribute is simply
+        removed again.
+        """
+        real, own = getattr(obj, name), vars(obj)
+        if name in own:
+            self.addCleanup(setattr, obj, name, own[name])
+        else:
+            self.addCleanup(delattr, obj, name)
+        setattr(obj, name, value)
+        return real
+
 
 # --------------------------------------------------------------------------- #
 # Pure helpers
@@ -307,8 +336,8 @@ class TestScanning(TempRepo):
         write_tree(self.root, {"d/a.txt": b"123", "d/sub/b.txt": b"45"})
         node = s._scan_dir_tree(self.root / "d", collect=False)
         self.assertEqual((node.file_count, node.total_bytes, node.dir_count), (2, 5, 1))
-        self.assertEqual(node.files, [])
-        self.assertEqual(node.children[0].files, [])
+        self.assertIsNone(node.files)
+        self.assertIsNone(node.children[0].files)
         with self.assertRaises(ValueError):
             s._entries_from_tree(node, s.FolderResult(name="d"))
 
@@ -326,6 +355,121 @@ class TestScanning(TempRepo):
         self.assertEqual([p.name for p in s.iter_top_level_dirs(self.root, False)], ["d"])
 
 
+def tree_totals(node: s.DirNode) -> dict[str, tuple]:
+    """Every node's subtree totals, keyed by path, for comparing two scans."""
+    out = {}
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        out[str(n.path)] = (
+            n.file_count, n.total_bytes, n.dir_count, n.links, n.errors, n.blocker_count,
+        )
+        stack.extend(n.children)
+    return out
+
+
+class TestWorkStealingScan(TempRepo):
+    """TreeScanner shares directories, not folders, across its workers."""
+
+    def lopsided_tree(self) -> None:
+        files = {f"big/d{i}/sub{j}/f{k}.txt": b"x" * (i + k)
+                 for i in range(8) for j in range(3) for k in range(4)}
+        files.update({"small/a.txt": b"a", "small/sub/b.txt": b"bb"})
+        write_tree(self.root, files)
+        (self.root / "big" / "empty").mkdir()
+
+    def scan(self, workers: int, collect: bool = True) -> list[s.DirNode]:
+        with s.TreeScanner(workers, collect) as scanner:
+            for name in ("big", "small"):
+                scanner.submit(self.root / name)
+            return sorted(scanner.completed(), key=lambda n: n.path.name)
+
+    def test_totals_match_the_serial_walk_exactly(self) -> None:
+        self.lopsided_tree()
+        for collect in (True, False):
+            with self.subTest(collect=collect):
+                parallel = self.scan(4, collect)
+                for node in parallel:
+                    self.assertEqual(
+                        tree_totals(node),
+                        tree_totals(s._scan_dir_tree(node.path, collect)),
+                    )
+
+    def test_parallel_tree_feeds_the_same_manifest(self) -> None:
+        self.lopsided_tree()
+        big = self.scan(4)[0]
+        got, _ = s._entries_from_tree(big, s.FolderResult(name="big"))
+        want, _ = s._entries_from_tree(
+            s._scan_dir_tree(self.root / "big"), s.FolderResult(name="big")
+        )
+        self.assertEqual(got, want)
+
+    def test_one_huge_folder_is_shared_between_workers(self) -> None:
+        """Regression: a lopsided volume scanned on a single thread."""
+        self.lopsided_tree()
+        readers = set()
+        real = s._scan_dir_entries
+
+        def slow_scan(node, *a):
+            readers.add(threading.current_thread().name)
+            time.sleep(0.005)  # give idle workers time to steal
+            return real(node, *a)
+
+        self.patch(s, "_scan_dir_entries", slow_scan)
+        with s.TreeScanner(4) as scanner:
+            scanner.submit(self.root / "big")
+            (node,) = list(scanner.completed())
+        self.assertEqual(node.file_count, 8 * 3 * 4)
+        self.assertGreater(len(readers), 1, "only one worker walked the big folder")
+
+    def force_stat_fan_out(self) -> None:
+        """Fan out every batch: a hot temp dir would never trip the probe."""
+        self.patch(s, "STAT_SLOW_NS", 0)
+
+    def test_stat_pool_gives_the_same_tree(self) -> None:
+        self.force_stat_fan_out()
+        files = {f"d/f{i:03}.txt": b"x" * i for i in range(150)}
+        files.update({f"d/sub{i}/g.txt": b"y" for i in range(80)})
+        write_tree(self.root, files)
+        serial = s._scan_dir_tree(self.root / "d")
+        with s._Pool(3, "stat") as pool:
+            pooled = s._scan_dir_tree(self.root / "d", stat_pool=pool)
+        self.assertEqual(tree_totals(pooled), tree_totals(serial))
+        self.assertEqual(
+            s._entries_from_tree(pooled, s.FolderResult(name="d")),
+            s._entries_from_tree(serial, s.FolderResult(name="d")),
+        )
+
+    def test_pooled_stats_keep_order_and_failures_in_place(self) -> None:
+        write_tree(self.root, {f"d/f{i:03}": b"x" * i for i in range(100)})
+        entries = sorted(os.scandir(self.root / "d"), key=lambda e: e.name)
+        (self.root / "d" / "f050").unlink()  # vanished between readdir and stat
+        self.force_stat_fan_out()
+        with s._Pool(4, "stat") as pool:
+            stats = s._stat_entries(entries, pool)
+        self.assertIsInstance(stats[50], OSError)
+        self.assertEqual(
+            [st.st_size for i, st in enumerate(stats) if i != 50],
+            [i for i in range(100) if i != 50],
+        )
+
+    @unittest.skipIf(sys.platform == "win32", "Windows stat data comes with the directory read")
+    def test_list_walk_never_stats_directories(self) -> None:
+        """A --list walk needs only d_type for directories: their stat fields
+        stay unset, proving no lstat was spent on them."""
+        write_tree(self.root, {"d/sub/f.txt": b"x"})
+        node = s._scan_dir_tree(self.root / "d", collect=False)
+        self.assertEqual(node.children[0].mtime_ns, 0)
+        self.assertNotEqual(s._scan_dir_tree(self.root / "d").children[0].mtime_ns, 0)
+
+    def test_cancellation_delivers_no_partial_tree(self) -> None:
+        self.lopsided_tree()
+        s.cancel_event.set()
+        with s.TreeScanner(2) as scanner:
+            scanner.submit(self.root / "big")
+            self.assertEqual(list(scanner.completed()), [])
+
+
 # --------------------------------------------------------------------------- #
 # Verification -- the gate that protects the invariant
 # --------------------------------------------------------------------------- #
@@ -397,6 +541,174 @@ class TestVerifyArchive(TempRepo):
         self.assertTrue(problems)
 
 
+class TestMergeVerify(TempRepo):
+    """Verification walks manifest and directory together, indexing only on need."""
+
+    ATTR = TestVerifyArchive.ATTR
+
+    def setUp(self) -> None:
+        super().setUp()
+        real, self.indexed = s._CentralDirectory, []
+
+        def counting(path):
+            self.indexed.append(path)
+            return real(path)
+
+        self.patch(s, "_CentralDirectory", counting)
+
+    def _archive(self, members: list[tuple[str, bytes]], name: str = "a.zip") -> Path:
+        z = self.root / name
+        with zipfile.ZipFile(z, "w") as zf:
+            for arcname, data in members:
+                zf.writestr(arcname, data)
+        return z
+
+    def _manifest(self, members: list[tuple[str, bytes]]) -> list[s.ManifestEntry]:
+        m = [s.ManifestEntry("src", n, len(d), 0, is_dir=n.endswith("/"),
+                             external_attr=(0o40775 << 16) | 0x10 if n.endswith("/") else self.ATTR)
+             for n, d in members]
+        m.sort(key=lambda e: (not e.is_dir, e.arcname))
+        return m
+
+    def test_writer_order_is_merged_without_an_index(self) -> None:
+        members = [("d/", b""), ("d/a", b"alpha"), ("d/b", b"beta"), ("d/c", b"gamma")]
+        z = self._archive(members)
+        m = self._manifest(members)
+        with s._MemberMerge(z) as merge:
+            self.assertTrue(merge.ordered)
+        for full in (True, False):
+            with self.subTest(full=full):
+                self.assertEqual(s._verify_archive(z, m, full, NullProgress(), 0), [])
+        self.assertEqual(self.indexed, [])
+
+    def test_members_outside_the_manifest_are_skipped(self) -> None:
+        """E.g. a member zipfile closed out truncated; the manifest never lists it."""
+        members = [("a", b"alpha"), ("b", b"half"), ("c", b"gamma")]
+        z = self._archive(members)
+        m = self._manifest([members[0], members[2]])
+        self.assertEqual(s._verify_archive(z, m, True, NullProgress(), 0), [])
+        self.assertEqual(self.indexed, [])
+
+    def test_collision_names_are_looked_up(self) -> None:
+        members = [("a.txt", b"alpha"), ("b__dup1.txt", b"renamed"), ("b.txt", b"beta")]
+        z = self._archive(members)
+        m = self._manifest(members[:1]) + self._manifest(members[1:2]) + self._manifest(members[2:])
+        self.assertEqual(s._verify_archive(z, m, True, NullProgress(), 0), [])
+        self.assertEqual(self.indexed, [z])
+
+    def test_appended_archive_falls_back_to_the_index(self) -> None:
+        old, new = [("b", b"old member")], [("a", b"new"), ("c", b"also new")]
+        z = self._archive(old + new)
+        with s._MemberMerge(z) as merge:
+            self.assertFalse(merge.ordered)
+        self.assertEqual(
+            s._verify_archive(z, self._manifest(old + new), True, NullProgress(), 0), []
+        )
+        self.assertEqual(self.indexed, [z])
+
+    def test_a_name_stored_twice_is_judged_by_its_last_copy(self) -> None:
+        """What an extractor gets is the last copy, so that is what must verify."""
+        with self.assertWarns(UserWarning):
+            z = self._archive([("a", b"stale"), ("b", b"beta"), ("a", b"current!")])
+        m = self._manifest([("a", b"current!"), ("b", b"beta")])
+        self.assertEqual(s._verify_archive(z, m, True, NullProgress(), 0), [])
+        stale = self._manifest([("a", b"stale"), ("b", b"beta")])
+        problems = s._verify_archive(z, stale, True, NullProgress(), 0)
+        self.assertEqual(len(problems), 1, problems)
+        self.assertIn("size mismatch for a", problems[0])
+
+    def test_missing_and_misordered_entries_are_still_found_or_reported(self) -> None:
+        members = [(f"f{i:02}", bytes([i]) * i) for i in range(10)]
+        z = self._archive(members)
+        m = self._manifest(members)
+        m[3], m[7] = m[7], m[3]
+        m.insert(5, s.ManifestEntry("src", "f04x", 1, 0, external_attr=self.ATTR))
+        problems = s._verify_archive(z, m, True, NullProgress(), 0)
+        self.assertEqual(problems, ["missing from archive: f04x"])
+
+
+class TestParallelVerify(TempRepo):
+    """--verify-threads: ranges of one archive checked on separate handles."""
+
+    ATTR = TestVerifyArchive.ATTR
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.patch(s, "VERIFY_RANGE_BYTES", 3 * s.VERIFY_MEMBER_COST)  # a few members per range
+        self.members = {f"m{i:02}.bin": bytes([i]) * (100 + i) for i in range(20)}
+        self.zip = self.root / "a.zip"
+        with zipfile.ZipFile(self.zip, "w") as zf:
+            for name, data in self.members.items():
+                zf.writestr(name, data)
+
+    def _manifest(self) -> list[s.ManifestEntry]:
+        return [s.ManifestEntry("src", n, len(d), 0, external_attr=self.ATTR)
+                for n, d in self.members.items()]
+
+    def test_problems_match_the_serial_path_in_order(self) -> None:
+        m = self._manifest()
+        m[2] = replace(m[2], arcname="gone.bin")
+        m[9] = replace(m[9], size=1)
+        m[17] = replace(m[17], external_attr=0)
+        raw = self.zip.read_bytes().replace(self.members["m13.bin"], b"X" * 113)
+        self.zip.write_bytes(raw)  # same length, bad CRC
+        self.assertGreater(len(list(s._verify_ranges(m))), 3)
+        serial = s._verify_archive(self.zip, m, True, NullProgress(), 0)
+        with s._Pool(3, "verify") as pool:
+            parallel = s._verify_archive(self.zip, m, True, NullProgress(), 0, pool)
+        self.assertEqual(len(serial), 4, serial)
+        self.assertIn("m13.bin", serial[2])
+        self.assertEqual(parallel, serial)
+
+    def test_progress_advances_by_every_verified_byte(self) -> None:
+        advanced = []
+
+        class Counting(NullProgress):
+            def advance(self, _task, n):
+                advanced.append(n)
+
+        with s._Pool(3, "verify") as pool:
+            self.assertEqual(
+                s._verify_archive(self.zip, self._manifest(), True, Counting(), 0, pool), []
+            )
+        self.assertEqual(sum(advanced), sum(map(len, self.members.values())))
+
+    def test_each_range_reads_through_its_own_handle(self) -> None:
+        real, handles = s._open_member, []
+
+        def tracking(fh, info):
+            handles.append(fh)  # held, so no two handles can share an id()
+            return real(fh, info)
+
+        self.patch(s, "_open_member", tracking)
+        m = self._manifest()
+        with s._Pool(2, "verify") as pool:
+            self.assertEqual(s._verify_archive(self.zip, m, True, NullProgress(), 0, pool), [])
+        self.assertEqual(len({id(h) for h in handles}), len(list(s._verify_ranges(m))))
+
+    def test_local_header_name_must_match_the_directory(self) -> None:
+        raw = self.zip.read_bytes()
+        self.zip.write_bytes(raw.replace(b"m05.bin", b"m5X.bin", 1))  # local header only
+        problems = s._verify_archive(self.zip, self._manifest(), True, NullProgress(), 0)
+        self.assertEqual(len(problems), 1, problems)
+        self.assertIn("unreadable member m05.bin", problems[0])
+
+    def test_cancel_propagates_and_leaves_no_range_running(self) -> None:
+        s.cancel_event.set()
+        with s._Pool(2, "verify") as pool:
+            with self.assertRaises(s.Cancelled):
+                s._verify_archive(self.zip, self._manifest(), True, NullProgress(), 0, pool)
+
+    def test_cli_round_trip(self) -> None:
+        write_tree(self.root, {f"d/f{i}.txt": b"x" * i for i in range(30)})
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--verify-threads", "4"])
+        self.assertEqual(code, 0)
+        self.assertFalse((self.root / "d").exists())
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertEqual(len(zf.namelist()), 30)
+
+
 # --------------------------------------------------------------------------- #
 # End-to-end: archive -> verify -> delete
 # --------------------------------------------------------------------------- #
@@ -581,6 +893,263 @@ class TestAppendToExistingArchive(TempRepo):
         self.assertEqual((self.root / "d.zip").read_bytes(), before, "archive was mutated")
 
 
+class TestCrcCatalog(TempRepo):
+    """--crc-catalog: unchanged sources are recognised without being re-read."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        write_tree(self.root, {"d/a.txt": b"alpha", "d/sub/b.txt": b"bravo"})
+        self.sidecar = self.root / f"d{s.CATALOG_SUFFIX}"
+        real, self.reads = s._file_crc32, []
+
+        def counting(path):
+            self.reads.append(os.path.basename(path))
+            return real(path)
+
+        self.patch(s, "_file_crc32", counting)
+
+    def _run(self) -> s.FolderResult:
+        res = self.run_folder(self.root / "d", keep=True, crc_catalog=True)
+        self.assertEqual(res.status, "ok", res.message)
+        return res
+
+    def test_rerun_reads_no_unchanged_source(self) -> None:
+        self._run()
+        self.assertTrue(self.sidecar.exists())
+        before = (self.root / "d.zip").read_bytes()
+        self.reads.clear()
+        self._run()
+        self.assertEqual(self.reads, [], "unchanged sources were re-read")
+        self.assertEqual((self.root / "d.zip").read_bytes(), before)
+
+    def test_without_the_flag_sources_are_read(self) -> None:
+        self._run()
+        self.reads.clear()
+        self.assertEqual(self.run_folder(self.root / "d", keep=True).status, "ok")
+        self.assertEqual(sorted(self.reads), ["a.txt", "b.txt"])
+
+    def test_same_size_edit_with_restored_mtime_is_not_trusted(self) -> None:
+        """rsync -t / touch -r put mtime back; ctime still moves."""
+        self._run()
+        src = self.root / "d" / "a.txt"
+        st = src.stat()
+        time.sleep(0.01)
+        src.write_bytes(b"ALPHA")
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns))
+        if src.stat().st_ctime_ns == st.st_ctime_ns:
+            self.skipTest("filesystem ctime too coarse to observe the edit")
+        self.reads.clear()
+        self._run()
+        self.assertEqual(self.reads, ["a.txt"])
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertEqual(zf.read("a.txt"), b"alpha")
+            self.assertEqual(zf.read("a__dup1.txt"), b"ALPHA", "edit mistaken for archived copy")
+
+    def test_rows_the_archive_does_not_confirm_are_ignored(self) -> None:
+        self._run()
+        with zipfile.ZipFile(self.root / "d.zip", "w") as zf:  # same names, other bytes
+            zf.writestr("a.txt", b"other")
+            zf.writestr("sub/b.txt", b"bravo")
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            index = {i.filename: (i.file_size, i.CRC, i.external_attr) for i in zf.infolist()}
+        catalog = s._CrcCatalog(self.sidecar)
+        catalog.load(index)
+        self.assertEqual(sorted(catalog._trusted), ["sub/b.txt"])
+
+    def test_unreadable_sidecar_is_ignored(self) -> None:
+        self._run()
+        self.sidecar.write_bytes(b"garbage")
+        self.reads.clear()
+        self._run()
+        self.assertEqual(sorted(self.reads), ["a.txt", "b.txt"])
+        self.reads.clear()
+        self._run()  # ... and was rewritten
+        self.assertEqual(self.reads, [])
+
+
+class TestResume(TempRepo):
+    """--resume: a cut-short run continues from its last checkpoint."""
+
+    FILES = {f"d/f{i:02}.txt": f"file {i} ".encode() * (i + 1) for i in range(20)}
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.patch(s, "CHECKPOINT_INTERVAL", 0)  # a checkpoint after every member
+        write_tree(self.root, self.FILES)
+        self.partial = self.root / f"d{s.PARTIAL_SUFFIX}"
+        self.journal = self.root / f"d{s.CHECKPOINT_SUFFIX}"
+        real_crc, real_stream = s._file_crc32, s._StoreWriter.add_stream
+        self.reads, self.writes = [], []
+
+        def counting_crc(path):
+            self.reads.append(path)
+            return real_crc(path)
+
+        def counting_stream(writer, entry, src):
+            self.writes.append(entry.arcname)
+            return real_stream(writer, entry, src)
+
+        self.patch(s, "_file_crc32", counting_crc)
+        self.patch(s._StoreWriter, "add_stream", counting_stream)
+
+    def _cancel_after(self, saves: int) -> s.FolderResult:
+        real_save = s._Checkpoint.save
+
+        def save(checkpoint, writer):
+            real_save(checkpoint, writer)
+            if checkpoint.saves >= saves:
+                s.cancel_event.set()
+
+        s._Checkpoint.save = save
+        try:
+            res = self.run_folder(self.root / "d", resume=True)
+        finally:
+            s._Checkpoint.save = real_save
+            s.cancel_event.clear()
+        self.assertEqual(res.status, "cancelled")
+        self.writes.clear()
+        return res
+
+    def assertArchived(self, res: s.FolderResult) -> None:
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertFalse((self.root / "d").exists())
+        self.assertFalse(self.partial.exists())
+        self.assertFalse(self.journal.exists())
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual({f"d/{n}": zf.read(n) for n in zf.namelist()}, self.FILES)
+
+    def test_a_cancelled_run_resumes_where_it_stopped(self) -> None:
+        res = self._cancel_after(8)
+        self.assertIn("--resume", res.message)
+        self.assertTrue(self.partial.exists())
+        self.assertEqual(len(list((self.root / "d").iterdir())), 20, "sources must survive")
+        self.assertArchived(self.run_folder(self.root / "d", resume=True))
+        self.assertEqual(len(self.writes), 12, self.writes)
+        self.assertEqual(self.reads, [], "checkpointed sources were re-read")
+
+    def test_a_crash_mid_save_falls_back_to_the_last_whole_checkpoint(self) -> None:
+        self._cancel_after(5)
+        with open(self.partial, "ab") as fh:
+            fh.write(os.urandom(5000))  # member bytes written after the checkpoint
+        data = self.journal.read_bytes()
+        with open(self.journal, "ab") as fh:
+            fh.write(data[-40:-3])  # a segment torn by the crash
+        self.assertArchived(self.run_folder(self.root / "d", resume=True))
+        self.assertEqual(len(self.writes), 15, self.writes)
+
+    def test_a_source_edited_since_the_checkpoint_is_stored_again(self) -> None:
+        self._cancel_after(3)
+        (self.root / "d" / "f00.txt").write_bytes(b"edited after the crash")
+        res = self.run_folder(self.root / "d", resume=True)
+        self.assertEqual(res.status, "ok", res.message)
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertEqual(zf.read("f00__dup1.txt"), b"edited after the crash")
+
+    def test_an_archive_changed_since_the_checkpoint_starts_over(self) -> None:
+        self._cancel_after(4)
+        with zipfile.ZipFile(self.root / "d.zip", "w") as zf:
+            zf.writestr("f00.txt", self.FILES["d/f00.txt"])
+        self.assertArchived(self.run_folder(self.root / "d", resume=True))
+        self.assertEqual(len(self.writes), 19, "journal trusted for a different archive")
+
+    def test_resuming_an_append_keeps_the_old_members(self) -> None:
+        with zipfile.ZipFile(self.root / "d.zip", "w") as zf:
+            zf.writestr("old.txt", b"from an earlier run")
+        self._cancel_after(6)
+        res = self.run_folder(self.root / "d", resume=True)
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual(len(self.writes), 14, self.writes)
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read("old.txt"), b"from an earlier run")
+            self.assertEqual(sum(not n.endswith("/") for n in zf.namelist()), 21)
+
+    def test_without_resume_a_stale_journal_is_ignored(self) -> None:
+        self._cancel_after(4)
+        res = self.run_folder(self.root / "d")
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertFalse(self.partial.exists())
+        self.assertEqual(len(self.writes), 20)
+        # Left alone, not trusted: load refuses it for any other partial.
+        self.assertTrue(self.journal.exists())
+
+    def test_without_resume_no_checkpoint_is_kept(self) -> None:
+        def unexpected(*_a):
+            raise AssertionError("checkpoint created without --resume")
+
+        self.patch(s, "_Checkpoint", unexpected)
+        s.cancel_event.set()
+        self.addCleanup(s.cancel_event.clear)
+        self.assertEqual(self.run_folder(self.root / "d").status, "cancelled")
+        self.assertEqual(self.run_folder(self.root / "d", dry_run=True).status, "cancelled")
+        self.assertFalse(self.journal.exists())
+
+    def test_resume_requires_store(self) -> None:
+        with captured_console() as out:
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--resume", "-c", "deflate"])
+        self.assertEqual(code, 2)
+        self.assertIn("--resume needs --compress store", out.getvalue())
+
+
+class TestCopyFile(TempRepo):
+    """_copy_file: clone, then in-kernel copy, then the Python loop."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.src = self.root / "src.zip"
+        self.payload = os.urandom(300_000)
+        self.src.write_bytes(self.payload)
+        self.patch(s, "KERNEL_COPY_CHUNK", 64 << 10)  # several calls: a mid-copy stop is possible
+
+    def _copy(self) -> str:
+        dst = self.root / "dst.partial"
+        method = s._copy_file(self.src, dst)
+        self.assertEqual(dst.read_bytes(), self.payload)
+        # The copy must be independent: appending to it leaves the source alone.
+        with open(dst, "ab") as fh:
+            fh.write(b"appended")
+        self.assertEqual(self.src.read_bytes(), self.payload, "existing archive mutated")
+        return method
+
+    def test_best_available_method_copies_exactly(self) -> None:
+        method = self._copy()
+        self.assertIn(method, ("reflink", "copy_file_range", "sendfile", "read/write"))
+
+    def test_each_fallback_copies_exactly(self) -> None:
+        self.patch(s, "_reflink", lambda fin, fout: False)
+        if hasattr(os, "copy_file_range"):
+            self.assertEqual(self._copy(), "copy_file_range")
+
+            def no_range(*_a):
+                raise OSError(errno.EXDEV, "cross-device")
+
+            self.patch(os, "copy_file_range", no_range)
+        if hasattr(os, "sendfile"):
+            self.assertEqual(self._copy(), "sendfile")
+
+            def no_sendfile(*_a):
+                raise OSError(errno.EINVAL, "not a socket")
+
+            self.patch(os, "sendfile", no_sendfile)
+        self.assertEqual(self._copy(), "read/write")
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"), "needs os.copy_file_range")
+    def test_a_copy_that_stops_midway_is_resumed(self) -> None:
+        self.patch(s, "_reflink", lambda fin, fout: False)
+        real, calls = os.copy_file_range, []
+
+        def flaky(*a):
+            calls.append(a)
+            if len(calls) > 2:
+                raise OSError(errno.EIO, "server went away")
+            return real(*a)
+
+        self.patch(os, "copy_file_range", flaky)
+        self.patch(os, "sendfile", lambda *_a: 0)  # "nothing copied": fall through
+        self.assertEqual(self._copy(), "copy_file_range+read/write")
+
+
 # --------------------------------------------------------------------------- #
 # Safety: every path that must NOT delete data
 # --------------------------------------------------------------------------- #
@@ -594,6 +1163,7 @@ class TestSafetyInvariant(TempRepo):
         partial_path = self.root / f"d{s.PARTIAL_SUFFIX}"
         child_code = """
 import sys
+import threading
 from pathlib import Path
 sys.path.insert(0, sys.argv[1])
 import small2zip as s
@@ -693,10 +1263,10 @@ lock.release()
 
         real_remove = s._force_remove
 
-        def refuse_one(path: str) -> None:
+        def refuse_one(path: str, dir_fd: int | None = None) -> None:
             if os.path.basename(path) == "held.txt":
                 raise PermissionError(13, "in use by another process")
-            real_remove(path)
+            real_remove(path, dir_fd)
 
         s._force_remove = refuse_one
         try:
@@ -825,6 +1395,444 @@ lock.release()
 WINDOWS = sys.platform == "win32"
 
 
+class TestParallelDelete(TempRepo):
+    """--delete-threads: per-directory batches, by name relative to a dir fd."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.patch(s, "DELETE_BATCH", 3)  # several batches even from one small directory
+        self.pool = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.pool.shutdown)
+        write_tree(self.root, {f"d/{sub}/f{i}.txt": sub.encode() * (i + 1)
+                               for sub in ("a", "b", "c/deep") for i in range(7)})
+
+    def run_folder(self, folder: Path, **argkw) -> s.FolderResult:
+        return s.process_folder(folder, make_args(**argkw), zipfile.ZIP_STORED, None,
+                                NullProgress(), delete_pool=self.pool)
+
+    def test_deletes_every_file_and_prunes_the_folder(self) -> None:
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual(res.deleted_files, 21)
+        self.assertEqual(res.undeleted, [])
+        self.assertFalse((self.root / "d").exists())
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertEqual(sum(not n.endswith("/") for n in zf.namelist()), 21)
+
+    @unittest.skipUnless(s._DIR_FD_DELETE, "dir-fd deletion is POSIX-only")
+    def test_full_path_fallback_gives_the_same_result(self) -> None:
+        self.patch(s, "_DIR_FD_DELETE", False)
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual(res.deleted_files, 21)
+        self.assertFalse((self.root / "d").exists())
+
+    def test_modified_file_is_kept_among_parallel_batches(self) -> None:
+        real_verify = s._verify_archive
+
+        def verify_then_mutate(*a, **k):
+            problems = real_verify(*a, **k)
+            (self.root / "d" / "b" / "f4.txt").write_bytes(b"rewritten after verify")
+            return problems
+
+        self.patch(s, "_verify_archive", verify_then_mutate)
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(res.status, "failed")
+        self.assertEqual(res.deleted_files, 20)
+        self.assertEqual(
+            res.undeleted[0], f"{self.root / 'd' / 'b' / 'f4.txt'}: modified after archiving"
+        )
+        self.assertEqual(len(res.undeleted), 2, res.undeleted)  # and the folder, not empty
+        self.assertEqual(os.listdir(self.root / "d" / "b"), ["f4.txt"])
+        self.assertFalse((self.root / "d" / "a").exists())
+
+    @unittest.skipUnless(s._DIR_FD_DELETE, "dir-fd deletion is POSIX-only")
+    def test_directory_swapped_for_a_symlink_is_not_followed(self) -> None:
+        """A path re-resolved after the swap would delete the link's target."""
+        decoy = self.root / "decoy"
+        decoy.mkdir()
+        for p in (self.root / "d" / "a").iterdir():
+            (decoy / p.name).write_bytes(p.read_bytes())
+            os.utime(decoy / p.name, ns=(p.stat().st_atime_ns, p.stat().st_mtime_ns))
+        real_verify = s._verify_archive
+
+        def verify_then_swap(*a, **k):
+            problems = real_verify(*a, **k)
+            shutil.rmtree(self.root / "d" / "a")
+            (self.root / "d" / "a").symlink_to(decoy, target_is_directory=True)
+            return problems
+
+        self.patch(s, "_verify_archive", verify_then_swap)
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(len(os.listdir(decoy)), 7, "the link's target must be untouched")
+        self.assertEqual(res.deleted_files, 14)
+        self.assertEqual(len(res.undeleted), 8, res.undeleted)  # 7 files + the folder
+
+    def test_cancel_mid_delete_counts_exactly_what_was_removed(self) -> None:
+        real_remove = s._force_remove
+        removed = []
+        lock = threading.Lock()
+
+        def remove_then_cancel(path: str, dir_fd: int | None = None) -> None:
+            real_remove(path, dir_fd)
+            with lock:
+                removed.append(path)
+                if len(removed) == 5:
+                    s.cancel_event.set()
+
+        self.patch(s, "_force_remove", remove_then_cancel)
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(res.status, "cancelled")
+        left = sum(len(files) for _, _, files in os.walk(self.root / "d"))
+        self.assertEqual(res.deleted_files, len(removed))
+        self.assertEqual(left + len(removed), 21)
+        self.assertTrue((self.root / "d.zip").exists(), "the verified archive stays")
+
+    def test_cli_round_trip(self) -> None:
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--delete-threads", "4"])
+        self.assertEqual(code, 0)
+        self.assertFalse((self.root / "d").exists())
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--delete-threads", "0"])
+        self.assertEqual(code, 2)
+
+
+class TestGroupCommit(TempRepo):
+    """--group-commit: shared sync barriers before publish and before delete."""
+
+    def run_folder(self, folder: Path, **argkw) -> s.FolderResult:
+        return s.process_folder(folder, make_args(**argkw), zipfile.ZIP_STORED, None,
+                                NullProgress(), group=s._GroupCommit())
+
+    def test_syncs_before_publishing_and_before_deleting(self) -> None:
+        write_tree(self.root, {"d/a.txt": b"a" * 100, "d/sub/b.txt": b"b"})
+        seen = []
+        real = s._GroupCommit._sync
+
+        def spy(paths):
+            seen.append(([p.name for p in paths], (self.root / "d.zip").exists(),
+                         (self.root / "d" / "a.txt").exists()))
+            real(paths)
+
+        self.patch(s._GroupCommit, "_sync", staticmethod(spy))
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual(seen, [
+            ([f"d{s.PARTIAL_SUFFIX}", f"d{s.LOCK_SUFFIX}"], False, True),  # before publish
+            (["d.zip"], True, True),  # published, nothing deleted yet
+        ])
+        self.assertFalse((self.root / "d").exists())
+
+    @unittest.skipUnless(s._syncfs, "syncfs(2) is Linux-only")
+    def test_folder_pays_no_fsync_of_its_own(self) -> None:
+        write_tree(self.root, {"d/a.txt": b"a", "d/b.txt": b"b"})
+        real = os.fsync
+        calls = []
+        self.patch(os, "fsync", lambda fd: (calls.append(fd), real(fd)))
+        res = self.run_folder(self.root / "d")
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual(calls, [])
+
+    def test_failed_sync_publishes_and_deletes_nothing(self) -> None:
+        write_tree(self.root, {"d/a.txt": b"a"})
+
+        def fail(paths):
+            raise OSError(errno.EIO, "I/O error")
+
+        self.patch(s._GroupCommit, "_sync", staticmethod(fail))
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(res.status, "failed")
+        self.assertIn("group commit failed", res.message)
+        self.assertTrue((self.root / "d" / "a.txt").exists())
+        self.assertFalse((self.root / "d.zip").exists())
+        self.assertEqual([p.name for p in self.root.glob("*.partial")], [])
+
+    def test_waiters_during_a_sync_share_the_next_one(self) -> None:
+        group, started, release = s._GroupCommit(), threading.Event(), threading.Event()
+        rounds = []
+
+        def slow(paths):
+            rounds.append(sorted(p.name for p in paths))
+            started.set()
+            release.wait(5)
+
+        self.patch(s._GroupCommit, "_sync", staticmethod(slow))
+        first = threading.Thread(target=group.barrier, args=(self.root / "first",))
+        first.start()
+        started.wait(5)
+        rest = [threading.Thread(target=group.barrier, args=(self.root / f"w{i}",))
+                for i in range(4)]
+        for th in rest:
+            th.start()
+        while group.requests < 5:
+            time.sleep(0.01)
+        release.set()
+        for th in [first, *rest]:
+            th.join(5)
+
+        self.assertEqual(rounds, [["first"], ["w0", "w1", "w2", "w3"]])
+        self.assertEqual((group.requests, group.rounds), (5, 2))
+
+    def test_fsync_fallback_without_syncfs(self) -> None:
+        write_tree(self.root, {"d/a.txt": b"a"})
+        self.patch(s, "_syncfs", None)
+        res = self.run_folder(self.root / "d")
+        self.assertEqual(res.status, "ok", res.message)
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertEqual(zf.namelist(), ["a.txt"])
+
+    def test_cli_round_trip(self) -> None:
+        write_tree(self.root, {f"d{i}/f.txt": b"x" * i for i in range(6)})
+        with captured_console() as out:
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--group-commit",
+                           "--device-workers", "4"])
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()),
+                         [f"d{i}.zip" for i in range(6)])
+        self.assertIn("Group commit: 12 barrier(s)", out.getvalue())
+
+
+class TestBatchedProgress(TempRepo):
+    """Per-thread progress batches, and --no-progress."""
+
+    class Recorder(NullProgress):
+        def __init__(self) -> None:
+            self.calls: list[tuple] = []
+
+        def advance(self, task_id, advance=1):
+            self.calls.append(("advance", task_id, advance))
+
+        def update(self, task_id, **fields):
+            self.calls.append(("update", task_id))
+
+        def remove_task(self, task_id):
+            if task_id == "gone":
+                raise KeyError(task_id)
+            self.calls.append(("remove", task_id))
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.patch(s, "PROGRESS_INTERVAL", 3600.0)  # nothing goes out on a timer here
+        self.inner = self.Recorder()
+        self.progress = s._BatchedProgress(self.inner)
+
+    def test_advances_are_summed_until_published(self) -> None:
+        for _ in range(1000):
+            self.progress.advance(1, 10)
+        self.progress.advance(2, 5)
+        self.assertEqual(self.inner.calls, [])
+        self.progress.update(1, description="verifying")
+        self.assertEqual(self.inner.calls,
+                         [("advance", 1, 10_000), ("advance", 2, 5), ("update", 1)])
+
+    def test_interval_publishes_without_a_flush(self) -> None:
+        self.patch(s, "PROGRESS_INTERVAL", 0.0)
+        for _ in range(s.PROGRESS_CHECK - 1):
+            self.progress.advance(1, 10)
+        self.assertEqual(self.inner.calls, [], "the clock is not read on every call")
+        self.progress.advance(1, 10)
+        self.assertEqual(self.inner.calls, [("advance", 1, 10 * s.PROGRESS_CHECK)])
+        big = s.PROGRESS_CHECK * s.PROGRESS_CHECK_BYTES
+        self.progress.advance(2, big)  # one large member is worth a full budget
+        self.assertEqual(self.inner.calls[-1], ("advance", 2, big))
+
+    def test_each_thread_publishes_its_own_batch(self) -> None:
+        def work():
+            for _ in range(500):
+                self.progress.advance(1, 2)
+            self.progress.flush()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        self.assertEqual(self.inner.calls, [("advance", 1, 1000)] * 4)
+
+    def test_removing_a_task_publishes_first(self) -> None:
+        self.progress.advance(3, 1)
+        self.progress.remove_task(3)
+        self.assertEqual(self.inner.calls, [("advance", 3, 1), ("remove", 3)])
+
+    def test_pool_threads_publish_before_the_folder_ends(self) -> None:
+        class Meter:
+            files = size = 0
+
+            def note(self, size, files=1):
+                self.size += size
+                self.files += files
+
+        meter = Meter()
+        progress = s._BatchedProgress(self.inner, meter)
+        write_tree(self.root, {f"d/{i}/f{j}.txt": b"x" * 10 for i in range(4) for j in range(5)})
+        with s._Pool(2, "verify") as verify_pool, ThreadPoolExecutor(2) as delete_pool:
+            res = s.process_folder(
+                self.root / "d", make_args(), zipfile.ZIP_STORED, None, progress,
+                verify_pool=verify_pool, delete_pool=delete_pool,
+            )
+
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual(self.inner.calls[-1], ("remove", 0))
+        advanced = sum(c[2] for c in self.inner.calls if c[0] == "advance")
+        self.assertEqual(advanced, 2 * res.archived_bytes, "write + full verify, all on the bar")
+        # Every member archived, verified and deleted reached the meter.
+        self.assertEqual(meter.files, 3 * res.archived_files + res.archived_dirs * 2)
+
+    def test_headless_run_prints_the_same_summary(self) -> None:
+        outputs = []
+        for flags in ([], ["--no-progress"]):
+            write_tree(self.root, {f"d{i}/f{j}.txt": b"x" * j for i in range(3) for j in range(4)})
+            with captured_console() as out:
+                code = s.main(["-d", str(self.root), "-y", "--no-log", "-w", "1", *flags])
+            self.assertEqual(code, 0)
+            # The totals footer; per-folder rows carry elapsed times.
+            outputs.append([line for line in out.getvalue().splitlines()
+                            if line.startswith("│ 3 folders")])
+            for zp in self.root.glob("*.zip"):
+                zp.unlink()
+        self.assertEqual(len(outputs[1]), 1)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertNotIn("Total (", out.getvalue(), "no bar is drawn")
+
+
+class TestStageTimings(TempRepo):
+    """FolderResult.stages: where each folder's time went."""
+
+    def test_every_stage_of_a_fresh_archive_is_timed(self) -> None:
+        write_tree(self.root, {f"d/f{i}.txt": b"x" * 100 for i in range(10)})
+        res = self.run_folder(self.root / "d")
+
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual(
+            list(res.stages), ["scan", "write", "fsync", "verify", "publish", "delete"]
+        )
+        self.assertEqual(res.stages["write"].bytes, 1000)
+        self.assertEqual(res.stages["write"].files, 10)
+        self.assertEqual((res.stages["verify"].bytes, res.stages["verify"].files), (1000, 10))
+        self.assertEqual(res.stages["delete"].files, 10)
+        self.assertEqual(res.stages["scan"].files, 10)
+        self.assertTrue(all(st.seconds >= 0 for st in res.stages.values()))
+
+    def test_append_times_the_copy_and_fast_verify_reads_no_bytes(self) -> None:
+        write_tree(self.root, {"d/a.txt": b"a" * 10})
+        self.run_folder(self.root / "d")
+        old_size = (self.root / "d.zip").stat().st_size
+        write_tree(self.root, {"d/b.txt": b"b" * 20})
+        res = self.run_folder(self.root / "d", verify="fast")
+
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertEqual((res.stages["copy"].bytes, res.stages["copy"].files), (old_size, 1))
+        self.assertEqual(res.stages["verify"].bytes, 0)
+
+    def test_stages_are_logged_per_folder(self) -> None:
+        path = self.root / "run.log"
+        s.setup_logging(path, False)
+        self.addCleanup(s.setup_logging, None, False)
+        write_tree(self.root, {"d/a.txt": b"a"})
+        self.run_folder(self.root / "d")
+        self.assertRegex(path.read_text(encoding="utf-8"),
+                         r"stages folder=.*d scan=[\d.]+s/1f write=[\d.]+s/1B/1f")
+
+    def test_cli_prints_the_breakdown(self) -> None:
+        write_tree(self.root, {"d/a.txt": b"a"})
+        with captured_console() as out:
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--timings"])
+        self.assertEqual(code, 0)
+        self.assertIn("Stages (summed over folders)", out.getvalue())
+
+
+class TestEvents(TempRepo):
+    """--events: an NDJSON record of each folder's lifecycle."""
+
+    def read_events(self, path: Path) -> list[dict]:
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    def test_cli_records_every_step_of_every_folder(self) -> None:
+        write_tree(self.root, {"a/x.txt": b"x", "a/y.txt": b"yy", "b/z.txt": b"z"})
+        path = self.root.parent / f"{self.root.name}.events"
+        self.addCleanup(path.unlink, missing_ok=True)
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--no-progress",
+                           "--events", str(path)])
+        self.assertEqual(code, 0)
+
+        got = self.read_events(path)
+        self.assertEqual(got[0]["event"], "run_started")
+        self.assertEqual(got[-1], {"ts": got[-1]["ts"], "event": "run_finished", "exit_code": 0})
+        self.assertEqual([e["ts"] for e in got], sorted(e["ts"] for e in got))
+        for name in ("a", "b"):
+            mine = [e for e in got if e.get("folder") == name]
+            self.assertEqual(
+                [e["event"] for e in mine],
+                ["queued", "started", "scanned", "archiving", "verified", "published",
+                 "deleted", "finished"],
+            )
+        finished = next(e for e in got if e["event"] == "finished" and e["folder"] == "a")
+        self.assertEqual(
+            (finished["status"], finished["archived_files"], finished["deleted_files"]),
+            ("ok", 2, 2),
+        )
+        self.assertEqual(finished["stages"]["write"]["bytes"], 3)
+
+    def test_progress_every_member_batch(self) -> None:
+        write_tree(self.root, {f"d/f{i:02}.txt": b"x" for i in range(12)})
+        path = self.root / "events"
+        self.patch(s, "EVENT_MEMBER_BATCH", 5)
+        s.events.open(str(path))
+        res = self.run_folder(self.root / "d")
+        s.events.close()
+
+        self.assertEqual(res.status, "ok", res.message)
+        progress = [e for e in self.read_events(path) if e["event"] == "progress"]
+        self.assertEqual([(e["members"], e["bytes"]) for e in progress], [(5, 5), (10, 10)])
+        self.assertEqual({e["of"] for e in progress}, {12})
+
+    def test_a_failed_verify_is_reported(self) -> None:
+        write_tree(self.root, {"d/a.txt": b"a"})
+        path = self.root / "events"
+        self.patch(s, "_verify_archive", lambda *a, **k: ["a.txt: crc mismatch"])
+        s.events.open(str(path))
+        self.run_folder(self.root / "d")
+        s.events.close()
+
+        got = {e["event"]: e for e in self.read_events(path)}
+        self.assertEqual((got["verified"]["ok"], got["verified"]["problems"]), (False, 1))
+        self.assertEqual(got["finished"]["status"], "failed")
+        self.assertNotIn("published", got)
+
+    def test_a_dead_reader_ends_the_stream_not_the_run(self) -> None:
+        read_fd, write_fd = os.pipe()
+        os.close(read_fd)
+        self.addCleanup(os.close, write_fd)
+        s.events.open(f"fd:{write_fd}")
+        write_tree(self.root, {"d/a.txt": b"a"})
+
+        res = self.run_folder(self.root / "d")
+        s.events.close()
+
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertFalse(s.events.enabled)
+
+    def test_closed_stream_emits_nothing(self) -> None:
+        self.assertFalse(s.events.enabled)
+        s.events.emit("queued", folder="x")  # no stream: a no-op, not an error
+
+    def test_rejected_outside_delete_mode(self) -> None:
+        with captured_console() as out:
+            code = s.main(["-l", str(self.root), "--no-log", "--events", str(self.root / "e")])
+        self.assertEqual(code, 2)
+        self.assertIn("--events applies only", out.getvalue())
+        self.assertFalse((self.root / "e").exists())
+
+
 class TestAttributeRetention(TempRepo):
     """The source is deleted, so anything not stored here is gone for good."""
 
@@ -910,9 +1918,9 @@ class TestAttributeRetention(TempRepo):
         seen: list[str] = []
         real_remove = s._force_remove
 
-        def spy(path: str) -> None:
+        def spy(path: str, dir_fd: int | None = None) -> None:
             seen.append(path)
-            real_remove(path)
+            real_remove(path, dir_fd)
 
         s._force_remove = spy
         try:
@@ -922,7 +1930,7 @@ class TestAttributeRetention(TempRepo):
 
         self.assertEqual(res.status, "ok", res.message)
         self.assertEqual(res.undeleted, [])
-        self.assertTrue(all(not os.path.isdir(p) for p in seen))
+        self.assertTrue(all(not (self.root / "d" / "sub" / p).is_dir() for p in seen))
         self.assertEqual(len(seen), 1, seen)
 
     def test_counts_report_files_and_dirs_separately(self) -> None:
@@ -1028,7 +2036,11 @@ class TestProcessFolderNeverRaises(TempRepo):
                     [self.root / "a", self.root / "b"],
                     argparse.Namespace(
                         exists=False, verify="full", keep=False, dry_run=False,
-                        compress="store", level=None, workers=2,
+                        crc_catalog=False, compress="store", level=None, workers=2,
+                        compress_threads=1, verify_threads=1, read_threads=0,
+                        read_ahead=s.READ_AHEAD_DEFAULT, resume=False, device_workers=None,
+                        auto_workers=False, delete_threads=2, group_commit=False,
+                        no_progress=False,
                     ),
                 )
         finally:
@@ -1046,9 +2058,9 @@ class TestVerifyAttributes(TempRepo):
         write_tree(self.root, {"d/a.txt": b"body"})
         real_verify = s._verify_archive
 
-        def verify_with_tampered_manifest(archive, manifest, full, progress, task_id):
+        def verify_with_tampered_manifest(archive, manifest, *rest):
             bad = [replace_attr(e) for e in manifest]
-            return real_verify(archive, bad, full, progress, task_id)
+            return real_verify(archive, bad, *rest)
 
         def replace_attr(e):
             from dataclasses import replace
@@ -1061,6 +2073,7 @@ class TestVerifyAttributes(TempRepo):
             s._verify_archive = real_verify
 
         self.assertEqual(res.status, "failed")
+        self.assertIn("verification failed", res.message)
         self.assertTrue((self.root / "d" / "a.txt").exists(), "source must survive")
         self.assertFalse((self.root / "d.zip").exists())
 
@@ -1650,7 +2663,8 @@ class TestTreeEnumeration(TempRepo):
         the arcname slice must not eat the first character of member names."""
         fs_root = Path("C:/") if WINDOWS else Path("/")
         node = s.DirNode(path=fs_root, collected=True)
-        node.files.append(s.ManifestEntry(str(fs_root / "f.txt"), "", 1, 0))
+        node.files = s.FileTable()
+        node.files.append("f.txt", 1, 0, 0)
         entries, _ = s._entries_from_tree(node, s.FolderResult(name="root"))
         self.assertEqual([e.arcname for e in entries], ["f.txt"])
 
@@ -1665,6 +2679,566 @@ class TestTreeEnumeration(TempRepo):
         )
 
 
+class TestFileTable(TempRepo):
+    """The packed per-directory cache must round-trip every field exactly."""
+
+    def test_round_trips_before_and_after_packing(self) -> None:
+        rows = [("a.txt", 3, -1, 0o100644 << 16), ("caf\u00e9 b", 2**40, 2**62, 0xFFFFFFFF)]
+        table = s.FileTable()
+        for row in rows:
+            table.append(*row)
+        self.assertEqual(list(table), rows)
+        table.pack()
+        self.assertIsInstance(table.names, str)
+        self.assertEqual(list(table), rows)
+        self.assertEqual(len(table), 2)
+
+    @unittest.skipIf(WINDOWS, "POSIX-only: names that are not valid UTF-8")
+    def test_undecodable_names_survive_the_cache(self) -> None:
+        name = os.fsdecode(b"bad-\xff-name")
+        write_tree(self.root, {f"d/{name}": b"x"})
+        entries, blockers = s._entries_from_tree(
+            s._scan_dir_tree(self.root / "d"), s.FolderResult(name="d")
+        )
+        self.assertEqual(blockers, [])
+        self.assertEqual([e.src for e in entries], [str(self.root / "d" / name)])
+
+    def test_cache_is_much_smaller_than_the_entries_it_stands_for(self) -> None:
+        import tracemalloc
+
+        write_tree(
+            self.root, {f"d/sub{i}/file-{j:04}.txt": b"x" for i in range(4) for j in range(500)}
+        )
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            node = s._scan_dir_tree(self.root / "d")
+            cache = tracemalloc.get_traced_memory()[0] - base
+            entries, _ = s._entries_from_tree(node, s.FolderResult(name="d"))
+            materialised = tracemalloc.get_traced_memory()[0] - base - cache
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(entries), 2004)
+        self.assertLess(cache * 3, materialised, (cache, materialised))
+
+
+class TestScanSpill(TempRepo):
+    """--max-scan-memory: over-budget enumerations live on disk, not in RAM."""
+
+    def _manifest(self, spill=None) -> list[tuple]:
+        entries, blockers = s._entries_from_tree(
+            s._scan_dir_tree(self.root / "d", spill=spill), s.FolderResult(name="d")
+        )
+        self.assertEqual(blockers, [])
+        return sorted((e.src, e.arcname, e.size, e.mtime_ns, e.external_attr) for e in entries)
+
+    def test_spilled_tables_give_the_same_manifest(self) -> None:
+        names = ["a.txt", "caf\u00e9", "\u65e5\u672c.bin"]
+        if not WINDOWS:
+            names.append(os.fsdecode(b"bad-\xff-name"))
+        write_tree(self.root, {f"d/{sub}{n}": n.encode("utf-8", "surrogateescape") * 3
+                               for sub in ("", "x/", "x/y/") for n in names})
+        store = s._SpillStore(0)
+        try:
+            spilled = self._manifest(store)
+            self.assertEqual(store.spilled_dirs, 3)
+            self.assertEqual(store.spilled_files, 3 * len(names))
+            self.assertEqual(store.resident, 0)
+        finally:
+            store.close()
+        self.assertEqual(spilled, self._manifest())
+
+    def test_budget_is_charged_then_refunded(self) -> None:
+        write_tree(self.root, {f"d/s{i}/f{j}": b"x" for i in range(6) for j in range(20)})
+        one = s._scan_dir_tree(self.root / "d" / "s0").files.nbytes()
+        store = s._SpillStore(one * 2)
+        try:
+            node = s._scan_dir_tree(self.root / "d", spill=store)
+            kinds = [type(c.files) for c in node.children]
+            self.assertEqual(kinds.count(s.FileTable), 2)
+            self.assertEqual(kinds.count(s.SpilledTable), 4)
+            self.assertEqual(store.resident, one * 2)
+            node.children.clear()
+            self.assertEqual(store.resident, 0, "freed tables must refund the budget")
+        finally:
+            store.close()
+
+    def test_delete_run_under_a_zero_budget(self) -> None:
+        write_tree(self.root, {"a/1.txt": b"one", "a/sub/2.txt": b"two", "b/3.txt": b"three"})
+        with captured_console() as buf:
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--max-scan-memory", "0"])
+        self.assertEqual(code, 0)
+        self.assertFalse((self.root / "a").exists())
+        with zipfile.ZipFile(self.root / "a.zip") as zf:
+            self.assertEqual(zf.read("sub/2.txt"), b"two")
+        self.assertIn("held on disk", buf.getvalue())
+
+    def test_size_parsing(self) -> None:
+        for text, want in (("0", 0), ("4096", 4096), ("512M", 512 << 20),
+                           ("2g", 2 << 30), ("1.5GiB", 3 << 29), ("64KB", 64 << 10)):
+            self.assertEqual(s.parse_size(text), want, text)
+        for bad in ("", "lots", "-1G", "inf", "nan", "1e400", "1e300G"):
+            with self.assertRaises(argparse.ArgumentTypeError, msg=bad):
+                s.parse_size(bad)
+
+    def test_cli_rejects_sizes_that_are_not_finite(self) -> None:
+        """A usage error (exit 2), not an OverflowError traceback."""
+        for flag in ("--max-scan-memory", "--limit-bytes", "--read-ahead"):
+            for value in ("inf", "nan", "1e400"):
+                with self.subTest(flag=flag, value=value):
+                    err = io.StringIO()
+                    with self.assertRaises(SystemExit) as ctx, contextlib.redirect_stderr(err):
+                        s.main(["-d", str(self.root), "--no-log", flag, value])
+                    self.assertEqual(ctx.exception.code, 2)
+                    self.assertIn("not a finite size", err.getvalue())
+
+    def test_list_mode_rejects_the_budget(self) -> None:
+        with captured_console():
+            self.assertEqual(s.main(["-l", str(self.root), "--max-scan-memory", "1G"]), 2)
+
+
+class TestReadAhead(TempRepo):
+    """--read-threads/--compress-threads: members read (and compressed) in a
+    pool, written in order."""
+
+    METHODS = [
+        m for m in ("store", "deflate", "bzip2", "lzma", "zstd") if m in s.COMPRESSION_METHODS
+    ]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.patch(s, "PREFETCH_MEMBER_MAX", 4096)  # so "big" below streams, like a huge file
+        self.patch(s, "STAT_SLOW_NS", 0)  # every open counts as slow: store prefetches too
+        write_tree(self.root, {
+            "d/a.txt": b"alpha " * 300, "d/empty": b"", "d/sub/b.bin": os.urandom(3000),
+            "d/sub/deeper/c.txt": b"gamma " * 50, "d/big.txt": b"big text " * 2000,
+        })
+
+    def _build(self, method: str, pool, name: str, entries=None, dest=None, **kw):
+        compression, _ = s.COMPRESSION_METHODS[method]
+        if entries is None:
+            entries, _ = s._entries_from_tree(
+                s._scan_dir_tree(self.root / "d"), s.FolderResult(name="d")
+            )
+        partial = self.root / f"{name}.zip.partial"
+        written, failures = s._archive_folder(
+            self.root / "d", dest or self.root / f"{name}.zip", partial, entries,
+            compression, None, NullProgress(), 0, prefetch_pool=pool, **kw,
+        )
+        return partial, written, failures
+
+    def test_archives_are_byte_identical_to_the_serial_path(self) -> None:
+        real, pooled = s._prefetch_member, []
+
+        def counting(entry, *a):
+            pooled.append(entry.arcname)
+            return real(entry, *a)
+
+        self.patch(s, "_prefetch_member", counting)
+        with s._Pool(3, "prefetch") as pool:
+            for method in self.METHODS:
+                with self.subTest(method=method):
+                    serial, w1, _ = self._build(method, None, f"serial-{method}")
+                    parallel, w2, f2 = self._build(method, pool, f"parallel-{method}")
+                    self.assertEqual(f2, [])
+                    self.assertEqual(w1, w2)
+                    self.assertEqual(serial.read_bytes(), parallel.read_bytes())
+                    self.assertEqual(s._verify_archive(parallel, w2, True, NullProgress(), 0), [])
+        # Every file but the one over PREFETCH_MEMBER_MAX went through the pool.
+        self.assertEqual(
+            sorted(set(pooled)), ["a.txt", "empty", "sub/b.bin", "sub/deeper/c.txt"]
+        )
+
+    def test_raw_members_match_zipfile_on_this_python(self) -> None:
+        """Fails loudly when a stdlib change breaks the raw path, which then
+        quietly falls back to streaming in production."""
+        self.addCleanup(s._raw_members.clear)
+        s._raw_members.clear()
+        for method in ("store", "deflate", "bzip2"):
+            compression, takes_level = s.COMPRESSION_METHODS[method]
+            for level in (None, *(s.LEVEL_RANGES[method] if takes_level else ())):
+                with self.subTest(method=method, level=level):
+                    self.assertTrue(s._raw_members_ok(compression, level))
+        # zipfile frames LZMA itself: those members are always streamed.
+        self.assertFalse(s._raw_members_ok(zipfile.ZIP_LZMA, None))
+
+    def test_a_codec_without_raw_members_still_matches_the_serial_path(self) -> None:
+        real, pooled = s._member_compressor, []
+
+        def refuse(compression, level):
+            if compression != zipfile.ZIP_STORED:
+                raise NotImplementedError("as on a future zipfile")
+            return real(compression, level)
+
+        self.patch(s, "STAT_PROBE", 1)  # as store: the window opens after one slow open
+        self.patch(s, "_member_compressor", refuse)
+        real_prefetch = self.patch(
+            s, "_prefetch_member", lambda entry, *a: pooled.append(a) or real_prefetch(entry, *a)
+        )
+        self.addCleanup(s._raw_members.clear)
+        s._raw_members.clear()
+        with s._Pool(2, "prefetch") as pool:
+            serial, _, _ = self._build("deflate", None, "serial")
+            parallel, written, failures = self._build("deflate", pool, "parallel")
+        self.assertEqual(failures, [])
+        self.assertEqual(serial.read_bytes(), parallel.read_bytes())
+        self.assertTrue(pooled, "the pool still reads ahead")
+        self.assertEqual({a[0] for a in pooled}, {zipfile.ZIP_STORED}, "but compresses nothing")
+
+    def test_appending_matches_the_serial_path(self) -> None:
+        with s._Pool(3, "prefetch") as pool:
+            outputs = []
+            for name, use in (("serial", None), ("parallel", pool)):
+                first, _, _ = self._build("deflate", None, f"{name}-base")
+                base = self.root / f"{name}.zip"
+                os.replace(first, base)
+                (self.root / "d" / "sub" / "new.txt").write_bytes(b"new " * 100)
+                partial, written, _ = self._build("deflate", use, name, dest=base)
+                (self.root / "d" / "sub" / "new.txt").unlink()
+                outputs.append(partial.read_bytes())
+                self.assertEqual(s._verify_archive(partial, written, True, NullProgress(), 0), [])
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_unreadable_and_changed_sources_behave_as_in_the_serial_path(self) -> None:
+        entries, _ = s._entries_from_tree(
+            s._scan_dir_tree(self.root / "d"), s.FolderResult(name="d")
+        )
+        (self.root / "d" / "a.txt").unlink()
+        (self.root / "d" / "sub" / "deeper" / "c.txt").write_bytes(b"changed")
+        with s._Pool(2, "prefetch") as pool:
+            partial, written, failures = self._build("deflate", pool, "p", entries=entries)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("a.txt", failures[0])
+        by_name = {e.arcname: e for e in written}
+        self.assertNotIn("a.txt", by_name)
+        self.assertEqual(by_name["sub/deeper/c.txt"].size, len(b"changed"))
+        self.assertEqual(s._verify_archive(partial, written, True, NullProgress(), 0), [])
+
+    def test_window_stays_within_the_read_ahead_budget(self) -> None:
+        write_tree(self.root, {f"d/many/f{i:02}": b"m" * 1000 for i in range(40)})
+        real, lock = s._prefetch_member, threading.Lock()
+        held = peak = 0
+        queued = []
+
+        def tracking(entry, *a):
+            nonlocal held, peak
+            with lock:
+                held += entry.size
+                peak = max(peak, held)
+            queued.append(entry.size)
+            return real(entry, *a)
+
+        real_take = s._ReadAhead.take
+
+        def take(self_, i):
+            nonlocal held
+            job = real_take(self_, i)
+            if job is not None:
+                size = job.result()[0].size
+                with lock:
+                    held -= size
+            return job
+
+        self.patch(s, "_prefetch_member", tracking)
+        self.patch(s._ReadAhead, "take", take)
+        with s._Pool(8, "prefetch") as pool:
+            partial, written, failures = self._build("store", pool, "p", read_ahead=4000)
+        self.assertEqual(failures, [])
+        self.assertGreater(len(queued), 40 - s.STAT_PROBE)  # the probe opens inline
+        # The window admits members while it holds less than the budget, so
+        # it can overshoot by at most one member.
+        self.assertLessEqual(peak, 4000 + s.PREFETCH_MEMBER_MAX)
+        self.assertLess(peak, 4000 + 3000)
+        self.assertEqual(s._verify_archive(partial, written, True, NullProgress(), 0), [])
+
+    def test_store_cli_round_trip(self) -> None:
+        real, pooled = s._prefetch_member, []
+
+        def counting(entry, *a):
+            pooled.append(entry.arcname)
+            return real(entry, *a)
+
+        self.patch(s, "_prefetch_member", counting)
+        write_tree(self.root, {f"d/0/f{i:02}": b"early" for i in range(s.STAT_PROBE)})
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--read-threads", "4",
+                           "--read-ahead", "1M"])
+        self.assertEqual(code, 0)
+        self.assertIn("sub/b.bin", pooled)
+        self.assertFalse((self.root / "d").exists())
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.getinfo("a.txt").compress_type, zipfile.ZIP_STORED)
+
+    def test_store_streams_inline_when_opens_are_fast(self) -> None:
+        write_tree(self.root, {f"d/many/f{i:02}": b"m" for i in range(40)})
+        self.patch(s, "STAT_SLOW_NS", 10**12)
+        real, pooled = s._prefetch_member, []
+        self.patch(s, "_prefetch_member", lambda *a: pooled.append(a) or real(*a))
+        with s._Pool(4, "prefetch") as pool:
+            partial, written, failures = self._build("store", pool, "p")
+            self.assertEqual(pooled, [])
+            # A codec never waits for the probe.
+            self._build("deflate", pool, "q")
+        self.assertTrue(pooled)
+        self.assertEqual(s._verify_archive(partial, written, True, NullProgress(), 0), [])
+
+    def test_read_threads_zero_streams_every_member(self) -> None:
+        real, pooled = s._prefetch_member, []
+        self.patch(s, "_prefetch_member", lambda *a: pooled.append(a) or real(*a))
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--read-threads", "0"])
+        self.assertEqual(code, 0)
+        self.assertEqual(pooled, [])
+        self.assertTrue((self.root / "d.zip").exists())
+
+    def test_cli_round_trip(self) -> None:
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "-c", "deflate",
+                           "--compress-threads", "4"])
+        self.assertEqual(code, 0)
+        self.assertFalse((self.root / "d").exists())
+        with zipfile.ZipFile(self.root / "d.zip") as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read("big.txt"), b"big text " * 2000)
+
+
+class TestStoreWriter(TempRepo):
+    """The lean store writer must produce what zipfile produces, byte for byte."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.patch(s, "PREFETCH_MEMBER_MAX", 4096)  # "big.bin" streams, and its header is patched
+        write_tree(self.root, {
+            "d/a.txt": b"alpha", "d/empty": b"", "d/sub/big.bin": os.urandom(20000),
+            "d/sub/\u00e9t\u00e9.txt": b"unicode name", "d/sub/deeper/c.txt": b"gamma " * 50,
+        })
+        (self.root / "d" / "emptydir").mkdir()
+
+    def _entries(self):
+        return s._entries_from_tree(s._scan_dir_tree(self.root / "d"), s.FolderResult(name="d"))[0]
+
+    @staticmethod
+    def _fill(writer, entries) -> list[tuple[int, int]]:
+        stored = []
+        with writer as w:
+            for e in entries:
+                if e.is_dir:
+                    stored.append(w.add_dir(e))
+                else:
+                    with open(e.src, "rb") as src:
+                        stored.append(w.add_stream(e, src))
+        return stored
+
+    def _both(self, entries, name: str = "x") -> tuple[Path, Path]:
+        lean, ref = self.root / f"{name}-lean.zip", self.root / f"{name}-ref.zip"
+        got = self._fill(s._StoreWriter(lean), entries)
+        want = self._fill(s._ZipfileWriter(ref, "w", zipfile.ZIP_STORED, None), entries)
+        self.assertEqual(got, want)
+        return lean, ref
+
+    def test_output_is_byte_identical_to_zipfile(self) -> None:
+        entries = self._entries()
+        self.assertTrue(any(e.is_dir for e in entries))
+        lean, ref = self._both(entries)
+        self.assertEqual(lean.read_bytes(), ref.read_bytes())
+        self.assertEqual(s._verify_archive(lean, entries, True, NullProgress(), 0), [])
+
+    def test_zip64_records_match_zipfile(self) -> None:
+        """Shrunk limits push every Zip64 branch: members, offsets, count, directory."""
+        saved = zipfile.ZIP64_LIMIT, zipfile.ZIP_FILECOUNT_LIMIT
+        zipfile.ZIP64_LIMIT, zipfile.ZIP_FILECOUNT_LIMIT = 3000, 3
+        try:
+            entries = self._entries()
+            lean, ref = self._both(entries)
+            self.assertEqual(lean.read_bytes(), ref.read_bytes())
+            with zipfile.ZipFile(lean) as zf:
+                self.assertIsNone(zf.testzip())
+                self.assertEqual(len(zf.infolist()), len(entries))
+        finally:
+            zipfile.ZIP64_LIMIT, zipfile.ZIP_FILECOUNT_LIMIT = saved
+
+    def test_append_carries_the_old_directory_over_verbatim(self) -> None:
+        entries = self._entries()
+        base, _ = self._both(entries[:3], "base")
+        base.write_bytes(base.read_bytes()[:-2] + b"\x03\x00abc")  # give it a comment
+        results = []
+        for name in ("lean", "ref"):
+            target = self.root / f"app-{name}.zip"
+            shutil.copyfile(base, target)
+            writer = (
+                s._StoreWriter(target, s._CentralDirectory(target)) if name == "lean"
+                else s._ZipfileWriter(target, "a", zipfile.ZIP_STORED, None)
+            )
+            self._fill(writer, entries[3:])
+            results.append(target.read_bytes())
+        self.assertEqual(results[0], results[1])
+        with zipfile.ZipFile(self.root / "app-lean.zip") as zf:
+            self.assertEqual(zf.comment, b"abc")
+        self.assertEqual(
+            s._verify_archive(self.root / "app-lean.zip", entries, True, NullProgress(), 0), []
+        )
+
+    def test_prefixed_archive_is_left_to_zipfile(self) -> None:
+        lean, _ = self._both(self._entries())
+        prefixed = self.root / "sfx.zip"
+        prefixed.write_bytes(b"#!stub\n" + lean.read_bytes())
+        base = s._CentralDirectory(prefixed)
+        self.assertEqual(base.concat, len(b"#!stub\n"))
+        with self.assertRaises(ValueError):
+            s._StoreWriter(prefixed, base)
+
+    def test_a_member_failing_mid_stream_is_rolled_back(self) -> None:
+        entries = self._entries()
+        big = next(e for e in entries if e.arcname == "sub/big.bin")
+
+        class Failing(io.BytesIO):
+            def read(self, n=-1):
+                if self.tell():
+                    raise OSError(errno.EIO, "I/O error")
+                return super().read(n)
+
+        lean = self.root / "r.zip"
+        with s._StoreWriter(lean) as w:
+            w.add_payload(entries[0], b"x" * entries[0].size, zlib.crc32(b"x" * entries[0].size))
+            with self.assertRaises(OSError):
+                w.add_stream(big, Failing(b"y" * big.size))
+            w.add_dir(replace(big, arcname="after/", is_dir=True, size=0))
+        with zipfile.ZipFile(lean) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), [entries[0].arcname, "after/"])
+
+    def test_many_members_batch_into_few_writes(self) -> None:
+        write_tree(self.root, {f"d/many/f{i:04}": b"z" * 100 for i in range(2000)})
+        calls = []
+        real = s.os.writev if hasattr(os, "writev") else s.os.write
+        name = "writev" if hasattr(os, "writev") else "write"
+
+        def counting(*a):
+            calls.append(1)
+            return real(*a)
+
+        self.patch(s.os, name, counting)
+        partial = self.root / "m.zip.partial"
+        written, failures = s._archive_folder(
+            self.root / "d", self.root / "m.zip", partial, self._entries(),
+            zipfile.ZIP_STORED, None, NullProgress(), 0,
+        )
+        self.assertEqual(failures, [])
+        self.assertLess(len(calls), 2000 // 50)
+        self.assertEqual(s._verify_archive(partial, written, True, NullProgress(), 0), [])
+
+
+class TestCentralDirectory(TempRepo):
+    """The array-backed directory must read every archive as zipfile does."""
+
+    def _archive(self, members: list[tuple[str, bytes]], name: str = "a.zip", **kw) -> Path:
+        path = self.root / name
+        with zipfile.ZipFile(path, "w", **kw) as zf:
+            for arcname, data in members:
+                zf.writestr(arcname, data)
+        return path
+
+    def assertMatchesZipfile(self, path: Path) -> s._CentralDirectory:
+        cd = s._CentralDirectory(path)
+        with zipfile.ZipFile(path) as zf:
+            infos = zf.infolist()
+            self.assertEqual(len(cd), len(infos))
+            for row, info in enumerate(infos):
+                self.assertEqual(cd.name(row), info.filename)
+                self.assertEqual(
+                    (cd.file_size[row], cd.compress_size[row], cd.crc[row], cd.attr[row],
+                     cd.header_offset[row], cd.method[row]),
+                    (info.file_size, info.compress_size, info.CRC, info.external_attr,
+                     info.header_offset, info.compress_type),
+                )
+            for name, info in zf.NameToInfo.items():
+                self.assertEqual(
+                    cd.entry(cd.find(name)), (info.file_size, info.CRC, info.external_attr)
+                )
+        return cd
+
+    def test_rows_and_lookups_match_zipfile(self) -> None:
+        path = self._archive(
+            [("d/", b""), ("d/a.txt", b"alpha"), ("d/b.bin", os.urandom(3000))],
+            compression=zipfile.ZIP_DEFLATED,
+        )
+        cd = self.assertMatchesZipfile(path)
+        self.assertEqual(cd.find("d/missing"), -1)
+        self.assertEqual(cd.find("d"), -1)
+        with zipfile.ZipFile(path) as zf, open(path, "rb") as fh:
+            with s._open_member(fh, cd.info(cd.find("d/b.bin"))) as member:
+                self.assertEqual(member.read(), zf.read("d/b.bin"))
+
+    def test_names_decode_like_zipfile(self) -> None:
+        """UTF-8 names carry flag bit 11; legacy names are cp437 without it."""
+        path = self._archive([("\u00e9t\u00e9.txt", b"utf-8"), ("plain.txt", b"ascii")])
+        legacy = bytearray(path.read_bytes())
+        cd = self.assertMatchesZipfile(path)
+        self.assertTrue(cd.flags[cd.find("\u00e9t\u00e9.txt")] & 0x800)
+        # Recast the UTF-8 name as cp437 bytes of the same length, flag cleared.
+        raw, flag = "\u00e9t\u00e9.txt".encode("utf-8"), 0x800
+        cp437 = raw.decode("cp437")
+        at = 0
+        while (at := legacy.find(raw, at)) >= 0:
+            legacy[at:at + len(raw)] = cp437.encode("cp437")
+            at += len(raw)
+        for sig, field in ((zipfile.stringFileHeader, 6), (zipfile.stringCentralDir, 8)):
+            at = legacy.find(sig)
+            bits = int.from_bytes(legacy[at + field:at + field + 2], "little")
+            legacy[at + field:at + field + 2] = (bits & ~flag).to_bytes(2, "little")
+        path.write_bytes(legacy)
+        cd = self.assertMatchesZipfile(path)
+        self.assertGreaterEqual(cd.find(cp437), 0)
+        self.assertEqual(cd.find("\u00e9t\u00e9.txt"), -1)
+
+    def test_a_duplicate_name_resolves_to_its_last_occurrence(self) -> None:
+        with self.assertWarns(UserWarning):
+            path = self._archive([("x.txt", b"first"), ("y.txt", b"y"), ("x.txt", b"second!")])
+        cd = self.assertMatchesZipfile(path)
+        self.assertEqual(cd.find("x.txt"), 2)
+
+    def test_zip64_records_match_zipfile(self) -> None:
+        saved = zipfile.ZIP64_LIMIT, zipfile.ZIP_FILECOUNT_LIMIT
+        zipfile.ZIP64_LIMIT, zipfile.ZIP_FILECOUNT_LIMIT = 3000, 3
+        try:
+            path = self._archive([(f"m{i}", os.urandom(1500)) for i in range(6)])
+        finally:
+            zipfile.ZIP64_LIMIT, zipfile.ZIP_FILECOUNT_LIMIT = saved
+        with open(path, "rb") as fh:
+            self.assertIn(zipfile.stringEndArchive64, fh.read())
+        self.assertMatchesZipfile(path)
+
+    def test_prefixed_archive_offsets_are_corrected(self) -> None:
+        path = self._archive([("a", b"alpha"), ("b", b"beta")])
+        path.write_bytes(b"#!stub\n" + path.read_bytes())
+        cd = self.assertMatchesZipfile(path)
+        self.assertEqual(cd.concat, len(b"#!stub\n"))
+
+    def test_garbage_is_a_bad_zip(self) -> None:
+        path = self.root / "junk.zip"
+        for data in (b"", b"not a zip at all" * 100, zipfile.stringEndArchive + b"\0" * 5):
+            path.write_bytes(data)
+            with self.subTest(data=data[:16]), self.assertRaises(zipfile.BadZipFile):
+                s._CentralDirectory(path)
+
+    def test_many_members_with_a_small_read_chunk(self) -> None:
+        """Records straddling ``CD_READ_CHUNK`` boundaries are reassembled."""
+        self.patch(s, "CD_READ_CHUNK", 100)
+        path = self._archive([(f"dir/{i:04}-" + "n" * (i % 37), b"") for i in range(500)])
+        cd = self.assertMatchesZipfile(path)
+        self.assertEqual(cd.find("dir/0499-" + "n" * (499 % 37)), 499)
+
+    def test_member_index_overlays_this_runs_writes(self) -> None:
+        path = self._archive([("a", b"alpha")])
+        idx = s._MemberIndex(s._CentralDirectory(path))
+        self.assertIn("a", idx)
+        self.assertNotIn("b", idx)
+        idx["b"] = (1, 2, 3)
+        idx["a"] = (4, 5, 6)
+        self.assertEqual((idx.get("a"), idx.get("b"), idx.get("c")), ((4, 5, 6), (1, 2, 3), None))
+
+
 class TestCachedEnumeration(TempRepo):
     """The delete pipeline replays the pre-scan's enumeration
     (_entries_from_tree) instead of re-walking the disk; a cached tree must
@@ -1756,6 +3330,24 @@ class TestRenderSummary(TempRepo):
             self._codes(s.FolderResult(name="a", status="cancelled"),
                         s.FolderResult(name="b", status="failed")), 1)
 
+    def test_timings_add_stage_columns_and_a_breakdown(self) -> None:
+        a = s.FolderResult(name="a", status="ok")
+        a.stages = {"write": s.StageStat(2.0, 4_000_000, 400), "delete": s.StageStat(0.5, 0, 400)}
+        b = s.FolderResult(name="b", status="ok")
+        b.stages = {"write": s.StageStat(2.0, 4_000_000, 400)}
+        with captured_console() as out:
+            s.render_summary([a, b], None, timings=True)
+        text = out.getvalue()
+        self.assertIn("Stages (summed over folders)", text)
+        row = next(line for line in text.splitlines() if line.startswith("│ write "))
+        # 4.00s of 4.50s; 800 files and 8 MB in 4 s.
+        for cell in ("4.00s", "89%", "800", "200", "2.0"):
+            self.assertIn(cell, row)
+        self.assertNotIn("│ copy", text, "stages no folder reached are left out")
+        with captured_console() as out:
+            s.render_summary([a, b], None)
+        self.assertNotIn("Stages", out.getvalue())
+
     def test_every_status_has_a_style(self) -> None:
         """render_summary indexes STATUS_STYLE directly; a gap would KeyError."""
         for status in ("ok", "skipped", "failed", "cancelled", "dry-run", "pending"):
@@ -1773,7 +3365,8 @@ class TestLogging(TempRepo):
         path = self.root / "logs" / "run.log"
         for _ in range(3):
             s.setup_logging(path, False)
-        kinds = [type(h).__name__ for h in s.log.handlers]
+        self.assertEqual(len(s.log.handlers), 1, s.log.handlers)  # the queue
+        kinds = [type(h).__name__ for h in s._log_listener.handlers]
         self.assertEqual(kinds.count("FileHandler"), 1, kinds)
 
     def test_creates_missing_parent_directories(self) -> None:
@@ -1781,8 +3374,7 @@ class TestLogging(TempRepo):
         s.setup_logging(path, False)
         log_line = "canary-entry"
         s.log.info(log_line)
-        for handler in s.log.handlers:
-            handler.flush()
+        self.assertTrue(s._flush_log(5))
         self.assertIn(log_line, path.read_text(encoding="utf-8"))
 
     def test_unwritable_log_path_exits_cleanly(self) -> None:
@@ -1798,6 +3390,67 @@ class TestLogging(TempRepo):
         s.setup_logging(None, False)
         self.assertEqual([type(h).__name__ for h in s.log.handlers], ["NullHandler"])
 
+    def test_full_queue_waits_and_each_thread_stays_in_order(self) -> None:
+        self.patch(s, "LOG_QUEUE_SIZE", 2)  # writers block constantly
+        path = self.root / "run.log"
+        s.setup_logging(path, False)
+
+        def work(n: int) -> None:
+            for i in range(300):
+                s.log.info("writer=%d line=%d", n, i)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        s.setup_logging(None, False)  # stops the writer after it drains
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 1200)
+        for n in range(4):
+            seen = [int(line.rsplit("=", 1)[1]) for line in lines if f"writer={n} " in line]
+            self.assertEqual(seen, list(range(300)))
+
+    def test_stopping_with_a_full_queue_writes_everything(self) -> None:
+        self.patch(s, "LOG_QUEUE_SIZE", 1)
+        path = self.root / "run.log"
+        s.setup_logging(path, False)
+        real = s._LogListener.handle
+        self.patch(s._LogListener, "handle",
+                   lambda listener, record: (time.sleep(0.02), real(listener, record)))
+        for i in range(3):
+            s.log.info("line=%d", i)
+        s.setup_logging(None, False)  # the queue is still full here
+        lines = path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual([line.rsplit("=", 1)[1] for line in lines], ["0", "1", "2"])
+
+    def test_arguments_are_captured_when_logged_and_tracebacks_kept(self) -> None:
+        path = self.root / "run.log"
+        s.setup_logging(path, False)
+        state = ["before"]
+        s.log.info("state=%s", state)
+        state[0] = "after"
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            s.log.exception("failed")
+        self.assertTrue(s._flush_log(5))
+        content = path.read_text(encoding="utf-8")
+        self.assertIn("state=['before']", content)
+        self.assertIn("ValueError: boom", content)
+
+    def test_each_folder_is_logged_completely_before_it_returns(self) -> None:
+        path = self.root / "run.log"
+        s.setup_logging(path, False)
+        write_tree(self.root, {"d/a.txt": b"a"})
+        real = s._LogListener.handle
+        slow = lambda listener, record: (time.sleep(0.01), real(listener, record))  # noqa: E731
+        self.patch(s._LogListener, "handle", slow)
+        res = self.run_folder(self.root / "d")
+        self.assertEqual(res.status, "ok", res.message)
+        self.assertIn("=== END folder=", path.read_text(encoding="utf-8"))
+
     def test_logs_the_argv_it_was_given_not_the_hosts(self) -> None:
         """Regression: main(argv) logged sys.argv -- the test runner's args --
         so the audit trail for an embedded/programmatic run was wrong."""
@@ -1894,6 +3547,500 @@ class TestMainEndToEnd(TempRepo):
             self.assertEqual(zf.read("1.txt"), b"text " * 500)
 
 
+class TestSchedule(TempRepo):
+    """Largest-first admission of folders, per-device caps, and the forecast."""
+
+    def schedule(self, workers: int, device_workers: int | None = None) -> s._Schedule:
+        # One second per file and nothing per byte, so costs read as counts.
+        sched = s._Schedule(workers, "full", device_workers)
+        sched.file_ns, sched.file_cpu_ns, sched.byte_ns, sched.passes = 1e9, 0.0, 0.0, 1
+        return sched
+
+    def node(self, name: str, files: int) -> tuple[Path, s.DirNode]:
+        return self.root / name, s.DirNode(self.root / name, file_count=files)
+
+    @contextlib.contextmanager
+    def devices(self, limits: dict[int, int | None]):
+        """Put folder ``h*`` on device 1 and everything else on device 2."""
+        real = s._device_of, s._device_limit
+        s._device_of = lambda path: 1 if path.name.startswith("h") else 2
+        s._device_limit = limits.get
+        try:
+            yield
+        finally:
+            s._device_of, s._device_limit = real
+
+    def drain(self, sched: s._Schedule) -> list[str]:
+        names = []
+        while (item := sched.next()) is not None:
+            names.append(item[0].name)
+        return names
+
+    def test_orders_by_cost_then_name(self) -> None:
+        sched = self.schedule(2)
+        sched.add([self.node("a", 1), self.node("b", 5), self.node("c", 1), self.node("d", 3)])
+        self.assertEqual(len(sched), 4)
+        self.assertEqual(self.drain(sched), ["b", "d", "a", "c"])
+        self.assertEqual(len(sched), 0)
+
+    def test_unscanned_folders_go_last_in_name_order(self) -> None:
+        sched = self.schedule(1)
+        sched.add([(self.root / "z", None), self.node("y", 2), (self.root / "x", None)])
+        self.assertEqual(self.drain(sched), ["y", "x", "z"])
+
+    def test_plan_simulates_lpt(self) -> None:
+        sched = self.schedule(2)
+        sched.add([self.node(f"f{i}", c) for i, c in enumerate((2, 3, 2, 3, 2))])
+        # 3|3, then each 2 on the first worker free: 5, 5, then 7.
+        self.assertEqual(sched.plan(), 7.0)
+        self.assertEqual(sched.predicted[self.root / "f1"], (3.0, 3.0))
+        self.assertEqual(len(sched), 5, "planning must not consume the queue")
+
+    def test_a_capped_device_does_not_hold_back_the_others(self) -> None:
+        with self.devices({1: 1}):
+            sched = self.schedule(3)
+            sched.add([self.node("h1", 5), self.node("h2", 4), self.node("s1", 1),
+                       self.node("s2", 1)])
+        self.assertEqual(self.drain(sched), ["h1", "s1", "s2"])
+        sched.finished(self.root / "h1")
+        self.assertEqual(self.drain(sched), ["h2"])
+
+    def test_plan_respects_device_caps(self) -> None:
+        with self.devices({1: 1}):
+            sched = self.schedule(2)
+            sched.add([self.node("h1", 3), self.node("h2", 3), self.node("s1", 1)])
+        # h2 waits for h1 even though the second worker is free after s1.
+        self.assertEqual(sched.plan(), 6.0)
+        self.assertEqual(sched.predicted[self.root / "h2"], (3.0, 6.0))
+
+    def test_device_workers_overrides_sysfs(self) -> None:
+        with self.devices({1: 1}):
+            sched = self.schedule(4, device_workers=2)
+            sched.add([self.node(n, 1) for n in ("h1", "h2", "h3", "s1", "s2", "s3")])
+        self.assertEqual(sched.limits, {1: 2, 2: 2})
+        self.assertEqual(sorted(self.drain(sched)), ["h1", "h2", "s1", "s2"])
+
+    def test_device_limit_of_unknown_devices(self) -> None:
+        self.assertIsNone(s._device_limit(-1))
+        limit = s._device_limit(s._device_of(self.root))
+        self.assertTrue(limit is None or limit >= 1, limit)
+
+    def test_calibrate_times_real_files(self) -> None:
+        write_tree(self.root, {f"d/{i}.bin": b"x" * 100 for i in range(10)})
+        write_tree(self.root, {"d/big.bin": b"y" * (2 * s.CHUNK_SIZE)})
+        sched = s._Schedule(2, "full")
+        sched.calibrate([s._scan_dir_tree(self.root / "d", True)])
+        self.assertTrue(sched.calibrated)
+        self.assertGreater(sched.byte_ns, 0)
+        self.assertNotEqual(sched.byte_ns, s.SCHEDULE_BYTE_NS_DEFAULT)
+
+    def test_calibrate_without_files_keeps_defaults(self) -> None:
+        (self.root / "empty").mkdir()
+        sched = s._Schedule(2, "fast")
+        sched.calibrate([s._scan_dir_tree(self.root / "empty", True)])
+        self.assertFalse(sched.calibrated)
+        self.assertTrue(sched.probed, "a fruitless probe is not retried")
+        self.assertEqual(sched.file_ns, s.SCHEDULE_FILE_NS_DEFAULT)
+
+    def test_calibrate_reads_are_charged_to_the_limits(self) -> None:
+        write_tree(self.root, {f"d/{i}.bin": b"x" * 100 for i in range(10)})
+        tree = s._scan_dir_tree(self.root / "d", True)
+        taken = []
+        self.patch(
+            s.io_limits, "take", lambda files=0, size=0, unlinks=0: taken.append((files, size))
+        )
+        s._Schedule(2, "full").calibrate([tree])
+        self.assertEqual(taken, [(1, 100)] * 10)
+
+    def test_dry_run_does_not_probe(self) -> None:
+        write_tree(self.root, {"a/f.txt": b"x"})
+        dirs = [self.root / "a"]
+        probed = []
+        self.patch(s._Schedule, "calibrate", lambda sched, nodes: probed.append(nodes))
+        with captured_console():
+            results = s.run_delete(
+                self.root, dirs,
+                make_args(compress="store", level=None, workers=1, compress_threads=1,
+                          verify_threads=1, read_threads=0, dry_run=True),
+                {d: s._scan_dir_tree(d, True) for d in dirs},
+            )
+        self.assertEqual([r.status for r in results], ["dry-run"])
+        self.assertEqual(probed, [])
+
+    def test_run_delete_admits_the_largest_folder_first(self) -> None:
+        write_tree(self.root, {"a/f.txt": b"x", "m/f.txt": b"x"})
+        write_tree(self.root, {f"z/{i}.txt": b"x" * 1000 for i in range(20)})
+        dirs = [self.root / n for n in ("a", "m", "z")]
+        cache = {d: s._scan_dir_tree(d, True) for d in dirs}
+        admitted = []
+        real = s.process_folder
+
+        def record(folder, *args, **kw):
+            admitted.append(folder.name)
+            return real(folder, *args, **kw)
+
+        self.patch(s, "process_folder", record)
+        with captured_console() as out:
+            results = s.run_delete(
+                self.root, dirs,
+                make_args(compress="store", level=None, workers=1, compress_threads=1,
+                          verify_threads=1, read_threads=0),
+                cache,
+            )
+        self.assertEqual(admitted, ["z", "a", "m"])
+        self.assertTrue(all(r.status == "ok" for r in results))
+        self.assertIn("predicted finish", out.getvalue())
+        self.assertIn("actual", out.getvalue())
+
+    def test_run_delete_keeps_a_capped_device_to_its_limit(self) -> None:
+        write_tree(self.root, {f"h{i}/f.txt": b"x" for i in range(4)})
+        active = peak = 0
+        lock = threading.Lock()
+        real = s.process_folder
+
+        def record(folder, *args, **kw):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            try:
+                return real(folder, *args, **kw)
+            finally:
+                with lock:
+                    active -= 1
+
+        self.patch(s, "process_folder", record)
+        with self.devices({1: 1}), captured_console():
+            results = s.run_delete(
+                self.root, [self.root / f"h{i}" for i in range(4)],
+                make_args(compress="store", level=None, workers=4, compress_threads=1,
+                          verify_threads=1, read_threads=0),
+            )
+        self.assertEqual(peak, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r.status == "ok" for r in results))
+
+    def test_device_workers_must_be_positive(self) -> None:
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--device-workers", "0"])
+        self.assertEqual(code, 2)
+
+
+class TestWorkerController(TempRepo):
+    """--workers auto: additive increase, multiplicative decrease on throughput."""
+
+    def controller(self, ceiling: int = 8) -> s._WorkerController:
+        sched = s._Schedule(ceiling, "full")
+        sched.file_ns, sched.file_cpu_ns, sched.byte_ns = 1e9, 0.0, 0.0  # work = files
+        return s._WorkerController(ceiling, sched)
+
+    def window(self, ctl: s._WorkerController, files: int, running: int | None = None) -> int:
+        """Feed one full window of *files* members; return the new limit."""
+        for _ in range(files):
+            ctl.note(100)
+        ctl._window -= s.AUTO_WORKERS_WINDOW
+        ctl.tick(ctl.limit if running is None else running)
+        return ctl.limit
+
+    def test_climbs_while_throughput_grows(self) -> None:
+        ctl = self.controller()
+        self.assertEqual(ctl.limit, s.AUTO_WORKERS_START)
+        self.assertEqual([self.window(ctl, n) for n in (10, 20, 30)], [3, 4, 5])
+        self.assertEqual(len(ctl.history), 3)
+
+    def test_backs_off_multiplicatively_on_a_loss(self) -> None:
+        ctl = self.controller(16)
+        for n in range(1, 7):
+            self.window(ctl, 10 * n)
+        self.assertEqual(ctl.limit, 8)
+        self.assertEqual(self.window(ctl, 20), 8, "one bad window is noise")
+        self.assertEqual(self.window(ctl, 20), 6)
+        self.assertEqual(self.window(ctl, 10), 6)
+        self.assertEqual(self.window(ctl, 10), 4)
+
+    def test_a_single_bad_window_is_forgiven(self) -> None:
+        ctl = self.controller()
+        self.window(ctl, 100)  # 2 -> 3
+        self.assertEqual([self.window(ctl, n) for n in (50, 100, 50, 100)], [3, 3, 3, 3])
+
+    def test_never_leaves_its_bounds(self) -> None:
+        ctl = self.controller(ceiling=3)
+        for n in (10, 20, 30, 40):
+            self.window(ctl, n)
+        self.assertEqual(ctl.limit, 3)
+        ctl = self.controller()
+        self.window(ctl, 50)
+        for n in (10, 10, 2, 2, 1, 1):  # 3 -> 2 -> 1, and no lower
+            self.window(ctl, n)
+        self.assertEqual(ctl.limit, 1)
+
+    def test_plateau_holds_then_probes(self) -> None:
+        ctl = self.controller()
+        self.window(ctl, 100)  # first window: 2 -> 3
+        limits = [self.window(ctl, 100) for _ in range(s.AUTO_WORKERS_HOLD)]
+        self.assertEqual(limits, [3] * (s.AUTO_WORKERS_HOLD - 1) + [4])
+
+    def test_starved_windows_are_discarded(self) -> None:
+        ctl = self.controller()
+        self.assertEqual(self.window(ctl, 100, running=1), s.AUTO_WORKERS_START)
+        self.assertEqual(ctl.history, [])
+        self.assertEqual(ctl._files, 0, "a discarded window must not leak into the next")
+
+    def test_limit_stays_within_the_device_caps(self) -> None:
+        ctl = self.controller()
+        ctl._schedule.limits = {1: 1}
+        self.assertEqual(self.window(ctl, 100), 1, "a limit no device can fill starves")
+        self.assertEqual(self.window(ctl, 200), 1)
+
+    def test_batched_progress_meters_bytes_and_members(self) -> None:
+        ctl = self.controller()
+        metered = s._BatchedProgress(NullProgress(), ctl)
+        metered.advance(7, 4096)
+        metered.advance(7, 0)  # a deletion: a member, no bytes
+        self.assertEqual(metered.add_task("x"), 0)
+        metered.flush()
+        self.assertEqual((ctl._files, ctl._bytes), (2, 4096))
+
+    def test_workers_auto_end_to_end(self) -> None:
+        self.assertEqual(s.build_parser().parse_args(["-w", "auto"]).workers, "auto")
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            s.build_parser().parse_args(["-w", "many"])
+        write_tree(self.root, {f"d{i}/f.txt": b"x" * i for i in range(5)})
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "-w", "auto"])
+        self.assertEqual(code, 0)
+        for i in range(5):
+            self.assertFalse((self.root / f"d{i}").exists())
+            with zipfile.ZipFile(self.root / f"d{i}.zip") as zf:
+                self.assertEqual(zf.read("f.txt"), b"x" * i)
+
+
+class TestIoLimits(TempRepo):
+    """--limit-*: token buckets shared by every thread, adjustable while running."""
+
+    def keep_signal_handlers(self) -> None:
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+
+    @unittest.skipUnless(hasattr(signal, "SIGHUP"), "POSIX only")
+    def test_hangup_without_a_limits_file_cancels(self) -> None:
+        self.keep_signal_handlers()
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        with captured_console():
+            s._install_signal_handlers()
+            os.kill(os.getpid(), signal.SIGHUP)
+        self.assertTrue(s.cancel_event.is_set(), "a hangup unwinds like SIGTERM")
+
+    @unittest.skipUnless(hasattr(signal, "SIGHUP"), "POSIX only")
+    def test_hangup_ignored_under_nohup_stays_ignored(self) -> None:
+        self.keep_signal_handlers()
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        s._install_signal_handlers()
+        self.assertIs(signal.getsignal(signal.SIGHUP), signal.SIG_IGN)
+
+    def test_unlimited_never_waits(self) -> None:
+        bucket = s._TokenBucket()
+        started = time.monotonic()
+        for _ in range(1000):
+            bucket.take(1 << 30)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(bucket.throttled, 0.0)
+
+    def test_waits_for_what_exceeds_one_seconds_burst(self) -> None:
+        bucket = s._TokenBucket(1000)
+        bucket.take(1000)  # the burst
+        started = time.monotonic()
+        bucket.take(200)
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        self.assertAlmostEqual(bucket.throttled, 0.2, delta=0.05)
+
+    def test_rate_holds_across_threads(self) -> None:
+        bucket = s._TokenBucket(2000)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _i: [bucket.take(50) for _ in range(15)], range(4)))
+        # 3000 taken at 2000/s with a 2000 burst: at least half a second.
+        self.assertGreaterEqual(time.monotonic() - started, 0.4)
+
+    def test_cancel_cuts_a_wait_short(self) -> None:
+        bucket = s._TokenBucket(1)
+        s.cancel_event.set()
+        started = time.monotonic()
+        bucket.take(100)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_parse(self) -> None:
+        text = "# production limits\nbytes = 50M\nfiles=2000  # opens + stats\nunlinks = off\n"
+        self.assertEqual(s._IoLimits.parse(text),
+                         {"bytes": 50 << 20, "files": 2000.0, "unlinks": 0.0})
+        for bad in ("bytes 50M", "reads = 5", "files = many", "files = -1", "bytes = inf"):
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                s._IoLimits.parse(bad)
+
+    def test_limits_file_is_reread_when_it_changes(self) -> None:
+        control = self.root / "limits"
+        limits = s._IoLimits()
+        limits.configure(control, files=100)
+        self.patch(s, "LIMITS_POLL_INTERVAL", 0)
+        limits.take()
+        self.assertEqual(limits.buckets["files"].rate, 100, "no file yet: the flags stand")
+        control.write_text("unlinks = 5\n")
+        limits.take()
+        self.assertEqual(limits.buckets["unlinks"].rate, 5)
+        self.assertEqual(limits.buckets["files"].rate, 100, "keys not in the file keep theirs")
+        control.write_text("unlinks = 50\nfiles = off\n")
+        limits.take()
+        self.assertEqual(limits.buckets["unlinks"].rate, 50)
+        self.assertEqual(limits.buckets["files"].rate, 0)
+        control.write_text("unlinks = fast\n")
+        limits.take()
+        self.assertEqual(limits.buckets["unlinks"].rate, 50, "a bad file keeps the limits")
+
+    def test_reload_request_rereads_at_once(self) -> None:
+        control = self.root / "limits"
+        control.write_text("bytes = 1M\n")
+        limits = s._IoLimits()
+        limits.configure(control)
+        limits.take()
+        self.assertEqual(limits.buckets["bytes"].rate, 1 << 20)
+        control.write_text("bytes = 2M\n")
+        limits.take()  # within the poll interval: not seen yet
+        limits.reload_requested = True  # what SIGHUP does
+        limits.take()
+        self.assertEqual(limits.buckets["bytes"].rate, 2 << 20)
+
+    def test_unlink_limit_end_to_end(self) -> None:
+        write_tree(self.root, {f"d/{i}.txt": b"x" for i in range(30)})
+        started = time.monotonic()
+        with captured_console() as out:
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--limit-unlinks", "20"])
+        self.assertEqual(code, 0)
+        self.assertFalse((self.root / "d").exists())
+        # 30 unlinks at 20/s with a one-second burst of 20: ~0.5 s of waiting.
+        self.assertGreaterEqual(time.monotonic() - started, 0.4)
+        self.assertIn("Throttled: bytes 0.0s, files 0.0s, unlinks 0.", out.getvalue())
+
+    def test_no_report_without_limits(self) -> None:
+        write_tree(self.root, {"d/f.txt": b"x"})
+        with captured_console() as out:
+            self.assertEqual(s.main(["-d", str(self.root), "-y", "--no-log"]), 0)
+        self.assertNotIn("Throttled", out.getvalue())
+
+    def test_negative_limits_are_rejected(self) -> None:
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--limit-files", "-1"])
+        self.assertEqual(code, 2)
+
+
+class TestPipeline(TempRepo):
+    """--pipeline: archiving starts per folder as its own scan completes."""
+
+    def test_every_folder_is_archived_and_removed(self) -> None:
+        write_tree(self.root, {f"d{i}/sub/f.txt": b"x" * i for i in range(7)})
+        with captured_console():
+            code = s.main(["-d", str(self.root), "-y", "--no-log", "--pipeline", "-w", "2"])
+
+        self.assertEqual(code, 0)
+        for i in range(7):
+            self.assertFalse((self.root / f"d{i}").exists())
+            with zipfile.ZipFile(self.root / f"d{i}.zip") as zf:
+                self.assertEqual(zf.read("sub/f.txt"), b"x" * i)
+
+    def test_scans_in_flight_stay_within_the_window(self) -> None:
+        write_tree(self.root, {f"d{i}/f.txt": b"x" for i in range(9)})
+        args = make_args(
+            compress="store", level=None, workers=1, stat_threads=0, small=None,
+            compress_threads=1, verify_threads=1, read_threads=0,
+        )
+        feed = s._PipelineFeed(s.iter_top_level_dirs(self.root, True), args)
+        peak = 0
+        real_pump = feed.pump
+
+        def pump():
+            nonlocal peak
+            out = real_pump()
+            peak = max(peak, feed._in_flight)
+            return out
+
+        feed.pump = pump
+        try:
+            with captured_console():
+                results = s.run_delete(self.root, (), args, feed=feed)
+        finally:
+            feed.close()
+        self.assertEqual(sorted(r.name for r in results), [f"d{i}" for i in range(9)])
+        self.assertTrue(all(r.status == "ok" for r in results))
+        self.assertLessEqual(peak, s.PIPELINE_SCAN_AHEAD * args.workers)
+        self.assertEqual(feed.found, 9)
+
+    def test_small_selects_the_same_directories(self) -> None:
+        files = {
+            "a/many/1": b"x", "a/many/2": b"x", "a/many/3": b"x",
+            "a/big/1": b"x" * 8192, "a/big/2": b"x" * 8192, "a/big/3": b"x" * 8192,
+            "b/one": b"x",
+            "c/deep/er/1": b"x", "c/deep/er/2": b"x", "c/deep/er/3": b"x",
+        }
+        archives = []
+        for run, extra in enumerate(([], ["--pipeline"])):
+            top = self.root / f"run{run}"
+            write_tree(top, files)
+            with captured_console():
+                code = s.main([
+                    "-s", str(top), "-y", "--no-log", "--small-files", "3", "--small-avg", "1",
+                    *extra,
+                ])
+            self.assertEqual(code, 0)
+            archives.append(sorted(p.relative_to(top).as_posix() for p in top.rglob("*.zip")))
+        self.assertEqual(archives[0], archives[1])
+        self.assertIn("a/many.zip", archives[1])
+        self.assertNotIn("a/big.zip", archives[1])
+
+    def test_small_with_exists_skips_archived_selections(self) -> None:
+        big = b"x" * 65536  # keeps a/ and b/ themselves from qualifying
+        write_tree(self.root, {
+            "a/big": big, "a/s/1": b"x", "a/s/2": b"x",
+            "b/big": big, "b/s/1": b"x", "b/s/2": b"x",
+        })
+        (self.root / "a" / "s.zip").write_bytes(b"not ours")
+        with captured_console() as buf:
+            code = s.main([
+                "-s", str(self.root), "-y", "--no-log", "--pipeline", "--exists",
+                "--small-files", "2", "--small-avg", "1",
+            ])
+        self.assertEqual(code, 0)
+        self.assertEqual((self.root / "a" / "s.zip").read_bytes(), b"not ours")
+        self.assertTrue((self.root / "a" / "s" / "1").exists())
+        self.assertFalse((self.root / "b" / "s").exists())
+        self.assertIn("1 selected directory skipped", buf.getvalue())
+
+    def test_conflicting_modes_are_rejected(self) -> None:
+        write_tree(self.root, {"a/1.txt": b"one"})
+        for argv in (
+            ["-d", str(self.root), "--dry-run"],
+            ["-l", str(self.root)],
+        ):
+            with self.subTest(argv=argv), captured_console():
+                self.assertEqual(s.main(argv + ["--pipeline", "--no-log"]), 2)
+        self.assertTrue((self.root / "a" / "1.txt").exists())
+
+    def test_prompt_does_not_invent_totals(self) -> None:
+        import builtins
+
+        real_input = builtins.input
+        builtins.input = lambda *a, **k: "no"
+        try:
+            with captured_console() as buf:
+                accepted = s.confirm_destructive(
+                    self.root, [], unscanned=[self.root / "a", self.root / "b"]
+                )
+        finally:
+            builtins.input = real_input
+        self.assertFalse(accepted)
+        self.assertIn("2 first-level, not yet scanned", buf.getvalue())
+        self.assertNotIn("Size:[/] 0", buf.getvalue())
+
+
 class TestConfirmPrompt(TempRepo):
     """The prompt must describe what will actually happen."""
 
@@ -1921,6 +4068,74 @@ class TestConfirmPrompt(TempRepo):
         self.assertNotIn("PERMANENTLY DELETED", out)
 
 
+class TestListCache(TempRepo):
+    """--list-cache: unchanged directories are replayed, changed ones re-read."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        write_tree(self.root, {"t/a/1": b"x" * 10, "t/a/b/2": b"yy", "t/c/3": b"zzz", "t/4": b""})
+        self.cache_file = self.root / "cache.json"
+        self._age(self.root / "t")
+
+    def _age(self, top: Path) -> None:
+        # Stamps from the last few seconds are deliberately not cached
+        # (DIR_CACHE_RACY_NS); backdate the tree as if written yesterday.
+        past = time.time() - 86400
+        for dirpath, _, _ in os.walk(top):
+            os.utime(dirpath, (past, past))
+
+    def _scan(self) -> tuple[s.DirNode, s._DirCache]:
+        cache = s._DirCache(self.cache_file)
+        node = s._scan_dir_tree(self.root / "t", collect=False, dir_cache=cache)
+        cache.save([self.root / "t"])
+        return node, cache
+
+    def test_unchanged_tree_is_served_from_cache(self) -> None:
+        first, cache = self._scan()
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+        second, cache = self._scan()
+        self.assertEqual((cache.hits, cache.misses), (4, 0))
+        self.assertEqual(tree_totals(second), tree_totals(first))
+
+    def test_changed_directory_is_rescanned(self) -> None:
+        self._scan()
+        (self.root / "t" / "a" / "b" / "new").write_bytes(b"n" * 100)
+        self._age(self.root / "t" / "a" / "b")  # bumps only b's ctime, as the write did
+        node, cache = self._scan()
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(
+            tree_totals(node),
+            tree_totals(s._scan_dir_tree(self.root / "t", collect=False)),
+        )
+
+    def test_recently_modified_directories_are_not_recorded(self) -> None:
+        self._scan()
+        (self.root / "t" / "c" / "fresh").write_bytes(b"")  # mtime: now
+        self._scan()
+        _, cache = self._scan()
+        self.assertEqual(cache.misses, 1, "a racy stamp must not be trusted")
+
+    def test_unreadable_cache_file_starts_afresh(self) -> None:
+        self.cache_file.write_text("{not json", encoding="utf-8")
+        node, cache = self._scan()
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(node.file_count, 4)
+        self.assertEqual(s._DirCache(self.cache_file).hits, 0)  # and it was rewritten
+
+    def test_cli_reports_hits_and_rejects_delete_mode(self) -> None:
+        argv = ["-l", str(self.root / "t"), "--list-cache", str(self.cache_file), "--no-log"]
+        with captured_console():
+            self.assertEqual(s.main(argv), 0)
+        with captured_console() as buf:
+            self.assertEqual(s.main(argv), 0)
+        self.assertIn("3 of 3 directories served from cache", " ".join(buf.getvalue().split()))
+        with captured_console():
+            code = s.main(["-d", str(self.root / "t"), "-y", "--no-log",
+                           "--list-cache", str(self.cache_file)])
+        self.assertEqual(code, 2)
+        self.assertTrue((self.root / "t" / "a" / "1").exists())
+
+
 class TestCli(TempRepo):
     def test_delete_requires_explicit_directory(self) -> None:
         """-d must never default to the cwd."""
@@ -100,7 +100,10 @@ class TestCrossProcessLock(unittest.TestCase):
             process.start()
             try:
                 self.assertTrue(ready.wait(10), "lock holder did not start")
-                args = argparse.Namespace(exists=False, verify="full", keep=False, dry_run=False)
+                args = argparse.Namespace(
+                    exists=False, verify="full", keep=False, dry_run=False, crc_catalog=False,
+                    read_ahead=s.READ_AHEAD_DEFAULT, resume=False,
+                )
                 result = s.process_folder(
                     folder, args, zipfile.ZIP_STORED, None, _NullProgress()
                 )